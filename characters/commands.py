@@ -1,32 +1,18 @@
-from random import randint
 from evennia import CmdSet
 from commands.command import Command
-from world.skills import SKILL_LIST, THE_LADDER
+from world.dice import DICE, render
+from world.ladder import LADDER
+from world.skills import SKILL_LIST
 
 from .sheet import CmdCharSheet
 from .creation import CmdSetAspect
 
 # Helper functions
-def roll():
-	roll_list = [randint(-1,1) for i in range(4)]
-	strings = []
-	for result in roll_list:
-		if result == -1:
-			strings.append('[|r-|n]')
-		elif result == 0:
-			strings.append('[ ]')
-		elif result == 1:
-			strings.append('[|g+|n]')
-		
-	return (" ".join(strings), sum(roll_list))
-
-def desc(value):
-		highest = ""
-		for bound, txt in THE_LADDER.items():
-			highest = txt
-			if value <= bound:
-				return txt
-		return highest
+def dice_for(caller):
+	"""Get the dice stream a character should roll with."""
+	if group := caller.ndb.group:
+		return group.dice
+	return DICE
 
 
 # Callbacks
@@ -36,11 +22,11 @@ def aspect_reroll(caller, aspect):
 		skill, _ = check
 		message = [f"You invoke |w{aspect}|n for a reroll."]
 		skill_mod = caller.skills[skill.lower()].value
-		result_str, result_int = roll()
+		outcome, result_int = dice_for(caller).roll()
 		result = int(result_int + skill_mod)
 		caller.db.current_roll = (skill, result)
-		message.append(result_str)
-		level = desc(result)
+		message.append(render(outcome))
+		level = LADDER.desc(result)
 		message.append(f"Your new {skill} check is {level}.")
 
 		caller.msg("\n".join(message))
@@ -57,7 +43,7 @@ def aspect_bonus(caller, aspect):
 		message = [f"You invoke |w{aspect}|n for a +2 bonus."]
 		result += 2
 		caller.db.current_roll = (skill, result)
-		level = desc(result)
+		level = LADDER.desc(result)
 		message.append(f"Your new {skill} check is {level}.")
 
 		caller.msg("\n".join(message))
@@ -67,9 +53,18 @@ def aspect_bonus(caller, aspect):
 		caller.msg("You don't have a recent check to reroll.")
 
 def aspect_assist(caller, aspect, target):
-	if check := caller.db.current_roll:
+	if check := target.db.current_roll:
 		skill, result = check
-	# finish this
+		result += 2
+		target.db.current_roll = (skill, result)
+		level = LADDER.desc(result)
+
+		caller.msg(f"You invoke |w{aspect}|n for a +2 bonus on {target}'s {skill} check. It is now {level}.")
+		target.msg(f"{caller} invokes |w{aspect}|n for a +2 bonus on your {skill} check. It is now {level}.")
+		caller.location.msg_contents(f"{target}'s new {skill} check is {level}.", exclude=(caller, target))
+
+	else:
+		caller.msg(f"{target} doesn't have a recent check to add a bonus to.")
 
 
 # Main commands
@@ -84,8 +79,8 @@ class CmdSkillRoll(Command):
 		caller = self.caller
 		skill = self.cmdstring
 
-		result_str, result_int = roll()
-		message = [f"{result_str}"]
+		outcome, result_int = dice_for(caller).roll()
+		message = [render(outcome)]
 		emote = None
 		
 		if skill == "roll":
@@ -117,7 +112,7 @@ class CmdSkillRoll(Command):
 
 			skill_name = caller.skills[skill].name
 
-			if target_checks := target.attributes.get(f"{action}_check"):
+			if target_checks := target.checks.get(f"{action}_check"):
 				# this object has DCs for this action
 				skill_reqs = target_checks.get("skills",[])
 				if skill_name not in skill_reqs:
@@ -135,10 +130,12 @@ class CmdSkillRoll(Command):
 			skill_mod = caller.skills[skill].value
 			result = int(result_int + skill_mod)
 
-			level = desc(result)
+			level = LADDER.desc(result)
 			message.append(f"Your {skill} check is {level}.")
 			emote = f"{caller} rolls a {level} {skill} check."
 			caller.db.current_roll = (skill, result)
+			if group := caller.ndb.group:
+				group.request_assist(caller, skill)
 
 		caller.msg("\n".join(message))
 		if emote:
@@ -197,16 +194,19 @@ class CmdInvoke(Command):
 			if not hasattr(target,"skills"):
 				caller.msg("You cannot assist that.")
 				return
-			
-			if check := caller.db.current_roll:
+
+			group = caller.ndb.group
+			if not group or not group.has(target):
+				caller.msg("You can only assist members of your group.")
+				return
+
+			if check := target.db.current_roll:
 				skill, result = check
-				result += 2
-				message = [f"Your new {skill} check is {desc(result)}."]
-				
+				action = (aspect_assist, {"aspect": aspect, "target": target})
+				group.poll(caller, action, f"invoke |w{aspect}|n for a +2 bonus on {target}'s {skill}")
+
 			else:
 				caller.msg(f"{target} doesn't have any check to add a bonus to.")
-			
-#		caller.msg("\n".join(message))
 
 
 class CmdCommitSkill(Command):
@@ -216,6 +216,10 @@ class CmdCommitSkill(Command):
 	def func(self):
 		caller = self.caller
 
+		if group := caller.ndb.group:
+			# stop waiting on teamwork and count whatever help was given
+			group.close_assist(caller)
+
 		check_dict = caller.db.current_check
 		skill, result = caller.db.current_roll
 
@@ -254,11 +258,11 @@ class CmdCommitSkill(Command):
 		"""
 		Actually execute the command and do any necessary cleanup.
 		"""
-		target_checks = target.attributes.get(f"{action}_check")
-		caller.execute_cmd(action, passed=True, target=check_dict["target"], bonus=bonus)
+		target_checks = target.checks.get(f"{action}_check")
+		caller.execute_cmd(action, passed=True, target=target, bonus=bonus)
 
-		if target_checks.get("oneshot",False):
-			target.attributes.remove(f"{action}_check")
+		if target_checks and target_checks.get("oneshot",False):
+			target.checks.remove(f"{action}_check")
 
 
 class FateCharCmdSet(CmdSet):
@@ -1,5 +1,35 @@
 
+from django.db import transaction
+from evennia.utils import create
+
 from commands.command import Command
+from .sheet import preset_skills
+
+def spawn_characters(specs, typeclass="typeclasses.characters.Character", location=None, batch_size=100):
+	"""
+	Create many characters at once, e.g. to populate a town.
+
+	Args:
+		specs (list): one dict per character, with a `key`, optionally
+			`skills` as {skill: rating}, and any other keyword accepted
+			by `create.create_object`
+		typeclass (str): the typeclass to create
+		location (obj): where to put characters without their own location
+		batch_size (int): how many characters to create per transaction
+
+	Returns:
+		list: the new characters
+	"""
+	created = []
+	for start in range(0, len(specs), batch_size):
+		with transaction.atomic():
+			for spec in specs[start:start+batch_size]:
+				spec = dict(spec)
+				spec.setdefault("location", location)
+				with preset_skills(spec.pop("skills", None)):
+					created.append(create.create_object(typeclass, **spec))
+	return created
+
 
 class CmdSetAspect(Command):
 	"""
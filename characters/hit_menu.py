@@ -0,0 +1,84 @@
+"""
+The "Getting Hit" menu
+
+When a hit lands on a character, they choose how to absorb it from the
+options that still fully absorb it. With no options, they're taken out.
+"""
+from evennia.utils.evmenu import EvMenu
+
+from conflict.hits import CONCEDE, CONSEQUENCES, CONSEQUENCE_TEXTS, describe_option
+
+# what the menu reports back to on_hit
+ABSORBED = "absorbed"
+TAKEN_OUT = "taken out"
+
+
+def take_hit(character, track, shifts, on_hit=None):
+	"""
+	Give a character the menu for a hit of `shifts` on a stress track.
+
+	Args:
+		character (Character): who was hit
+		track (str): "physical" or "mental"
+		shifts (int): the size of the hit
+		on_hit (callable, optional): called as on_hit(character, result)
+			once the hit is dealt with, where result is ABSORBED, CONCEDE
+			or TAKEN_OUT
+	"""
+	if shifts <= 0:
+		return
+	if not character.status.hit_options(track, shifts):
+		character.msg(f"You take {shifts} shifts and have nothing left to absorb them. You're taken out!")
+		if on_hit:
+			on_hit(character, TAKEN_OUT)
+		return
+	EvMenu(character, "characters.hit_menu", startnode="menunode_hit", cmd_on_exit=None,
+		startnode_input=("", {"track": track, "shifts": shifts, "on_hit": on_hit}))
+
+
+def menunode_hit(caller, raw_string, track, shifts, on_hit=None, note=None, **kwargs):
+	text = f"You've been hit for {shifts} shifts of {track} stress! How do you absorb it?"
+	if note:
+		text = f"{note}\n\n{text}"
+
+	options = []
+	for option in caller.status.hit_options(track, shifts):
+		options.append({"desc": describe_option(option), "goto": (_absorb, {
+			"track": track, "shifts": shifts, "option": option, "on_hit": on_hit,
+		})})
+	return text, options
+
+
+def _absorb(caller, raw_string, track, shifts, option, on_hit=None, **kwargs):
+	status = caller.status
+	options = status.hit_options(track, shifts)
+	if option == CONCEDE:
+		result = CONCEDE
+	elif option not in options:
+		# the box or a consequence slot was taken since the menu was shown
+		if options:
+			return "menunode_hit", {
+				"track": track, "shifts": shifts, "on_hit": on_hit,
+				"note": "That option is no longer available.",
+			}
+		result = TAKEN_OUT
+	else:
+		# the option is still available, so every part of it applies
+		if option.box:
+			status.check_box(track, option.box, save=False)
+		for i, slot in enumerate(CONSEQUENCES):
+			if option.consequences >> i & 1:
+				status.take_consequence(slot, CONSEQUENCE_TEXTS[track][i], save=False)
+		status.save()
+		result = ABSORBED
+	if on_hit:
+		on_hit(caller, result)
+	return "menunode_done", {"result": result}
+
+
+def menunode_done(caller, raw_string, result, **kwargs):
+	if result == CONCEDE:
+		return "You concede the conflict.", None
+	if result == TAKEN_OUT:
+		return "You have nothing left to absorb the hit. You're taken out!", None
+	return f"You absorb the hit.\n\n {caller.status.display()}", None
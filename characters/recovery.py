@@ -0,0 +1,131 @@
+"""
+Consequence recovery
+
+Consequences recover on their own over time: a fresh consequence starts
+recovering, and is rewritten to say so, then a while later it clears.
+
+Rather than a timer per consequence, one global script keeps every
+pending recovery on a min-heap of (due time, character id, slot) and
+sets a single reactor call for whichever is due first. When it wakes,
+everything due is recovered together, with the characters loaded in one
+query. The heap is persisted as a plain tuple, so after a reload it's
+rebuilt from that alone without looking at any characters.
+
+The scheduler is set up in GLOBAL_SCRIPTS in the settings and is reached
+with `get_recovery()`.
+"""
+import heapq
+from time import time
+
+from twisted.internet import reactor
+from evennia import DefaultScript
+from evennia.objects.models import ObjectDB
+from evennia.typeclasses.attributes import AttributeProperty
+from evennia.utils import lazy_property
+
+from conflict.hits import CONSEQUENCES
+
+# how long each step of recovery takes for each consequence slot, in
+# seconds: mild, moderate and severe
+RECOVERY_TIMES = (60 * 60, 24 * 60 * 60, 7 * 24 * 60 * 60)
+
+
+def get_recovery():
+	"""
+	Get the global recovery scheduler.
+	"""
+	from evennia import GLOBAL_SCRIPTS
+	return GLOBAL_SCRIPTS.consequence_recovery
+
+
+class RecoveryScheduler(DefaultScript):
+	"""
+	Global script which recovers consequences when they're due.
+	"""
+	# the pending recoveries as (due, character id, slot index) tuples
+	pending = AttributeProperty(default=())
+
+	@lazy_property
+	def _heap(self):
+		heap = [tuple(entry) for entry in self.pending]
+		heapq.heapify(heap)
+		return heap
+
+	def add(self, character, slot):
+		"""
+		Schedule the next step of recovery for one of a character's consequences.
+
+		Args:
+			character (Character): whose consequence it is
+			slot (str): "mild", "moderate" or "severe"
+		"""
+		index = CONSEQUENCES.index(slot)
+		self._push((time() + RECOVERY_TIMES[index], character.id, index))
+
+	def _push(self, entry):
+		heap = self._heap
+		heapq.heappush(heap, entry)
+		self._save()
+		if heap[0] is entry:
+			self.wake()
+
+	def _save(self):
+		"""
+		Persist the heap, once at the end of the reactor tick however
+		many times it changed.
+		"""
+		if not self.ndb.save_call:
+			self.ndb.save_call = reactor.callLater(0, self._write)
+
+	def _write(self):
+		self.nattributes.remove("save_call")
+		self.pending = tuple(self._heap)
+
+	def wake(self):
+		"""
+		Set the reactor call for the next due recovery, e.g. after a reload.
+		"""
+		heap = self._heap
+		call = self.ndb.wake_call
+		if not heap:
+			if call and call.active():
+				call.cancel()
+			return
+		delay = max(0, heap[0][0] - time())
+		if call and call.active():
+			call.reset(delay)
+		else:
+			self.ndb.wake_call = reactor.callLater(delay, self.recover_due)
+
+	def recover_due(self):
+		"""
+		Recover every consequence that's due, then sleep until the next one.
+		"""
+		heap = self._heap
+		now = time()
+		due = {}
+		while heap and heap[0][0] <= now:
+			_, char_id, index = heapq.heappop(heap)
+			due.setdefault(char_id, []).append(index)
+
+		if due:
+			characters = ObjectDB.objects.in_bulk(list(due))
+			for char_id, indexes in due.items():
+				# characters deleted since are just dropped
+				if character := characters.get(char_id):
+					self._recover(character, indexes, now)
+			self._save()
+
+		self.wake()
+
+	def _recover(self, character, indexes, now):
+		status = character.status
+		for index in indexes:
+			slot = CONSEQUENCES[index]
+			if not (consequence := status.consequences[index]):
+				continue
+			if status.recover(slot):
+				character.msg(f"Your {slot} consequence, {consequence[0]}, has started to recover.")
+				heapq.heappush(self._heap, (now + RECOVERY_TIMES[index], character.id, index))
+			else:
+				character.msg(f"Your {slot} consequence, {consequence[0]}, has cleared.")
@@ -1,71 +1,191 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from evennia.utils import list_to_string
-from evennia.contrib.rpg.traits import StaticTrait, TraitException
 
-from world.skills import SKILL_LIST, THE_LADDER
+from characters.recovery import get_recovery
+from conflict.hits import CONSEQUENCES, TRACKS, TRACK_SKILLS, hit_options, stress_boxes
+from world.ladder import LADDER
+from world.skills import SKILL_LIST, SKILL_KEYS, SKILL_NAMES, SKILL_INDEX
+
+# starting skill ratings for characters created inside `preset_skills`
+_PRESET_SKILLS = ContextVar("preset_skills", default=None)
+
+@contextmanager
+def preset_skills(values):
+	"""
+	Characters created inside this block start with the given
+	{skill: rating} values instead of all zeroes.
+	"""
+	token = _PRESET_SKILLS.set(values)
+	try:
+		yield
+	finally:
+		_PRESET_SKILLS.reset(token)
 
-def init_skills(obj):
+def init_skills(obj, values=None):
 	"""
 	Initialize all of the skills for the game on a character.
+
+	The whole skill vector is built in memory and saved in one write.
+	`values` optionally maps skill names to starting ratings.
 	"""
-	for skill, actions in SKILL_LIST.items():
-		obj.skills.add(skill.lower(), skill, descs=THE_LADDER, trait_type="skill", actions=actions)
+	values = values or _PRESET_SKILLS.get() or {}
+	values = {skill.lower(): rating for skill, rating in values.items()}
 
-class SkillTrait(StaticTrait):
+	obj.attributes.add(SkillHandler.attr_key, tuple(int(values.get(key, 0)) for key in SKILL_KEYS))
+	# any cached handler is holding the old data
+	obj.__dict__.pop("skills", None)
+
+
+class Skill:
 	"""
-	A child class of static traits that adds in the level
-	description functionality of counter traits.
+	A view of one slot in a character's skill vector, with the
+	same `name`/`value`/`desc()` interface as a skill trait.
 	"""
-	trait_type = "skill"
-
-	default_keys = {
-		"base": 0,
-		"mod": 0,
-		"mult": 1.0,
-		"descs": None,
-	}
-
-	@staticmethod
-	def validate_input(cls, trait_data):
-		"""Add extra validation for descs"""
-		trait_data = super().validate_input(cls, trait_data)
-		# validate descs
-		descs = trait_data["descs"]
-		if isinstance(descs, dict):
-			if any(
-				not (isinstance(key, (int, float)) and isinstance(value, str))
-				for key, value in descs.items()
-			):
-				raise TraitException(
-					f"Trait descs must be defined on the "
-					f"form {{number:str}} (instead found {descs})."
-				)
-		return trait_data
+	__slots__ = ("handler", "index")
+
+	def __init__(self, handler, index):
+		self.handler = handler
+		self.index = index
+
+	@property
+	def key(self):
+		return SKILL_KEYS[self.index]
+
+	@property
+	def name(self):
+		return SKILL_NAMES[self.index]
+
+	@property
+	def actions(self):
+		return SKILL_LIST[self.name]
+
+	@property
+	def value(self):
+		return self.handler.values[self.index]
+
+	@value.setter
+	def value(self, value):
+		self.handler.set(self.key, value)
+
+	base = value
 
 	def desc(self):
 		"""
-		Retrieve descriptions of the current value, if available.
-		This must be a mapping {upper_bound_inclusive: text},
-		ordered from small to big. Any value above the highest
-		upper bound will be included as being in the highest bound.
-		rely on Python3.7+ dicts retaining ordering to let this
-		describe the interval.
-		Returns:
-			str: The description describing the `value` value.
-				If not found, returns the empty string.
-		"""
-		descs = self._data["descs"]
-		if descs is None:
-			return ""
-		value = self.value
-		# we rely on Python3.7+ dicts retaining ordering
-		highest = ""
-		for bound, txt in descs.items():
-			highest = txt
-			if value <= bound:
-				return txt
-		# if we get here we are above the highest bound so
-		# we return the latest bound specified.
-		return highest
+		Retrieve the ladder description of the current value.
+		"""
+		return LADDER.desc(self.value)
+
+
+class SkillHandler:
+	"""
+	Stores a character's skill ratings as a single tuple of ints, in
+	SKILL_LIST order. The ladder is shared, not stored per skill.
+	"""
+	attr_key = "_skills"
+
+	def __init__(self, obj):
+		self.obj = obj
+		values = obj.attributes.get(self.attr_key)
+		if values is None:
+			values = self._migrate()
+		values = tuple(values)
+		if len(values) < len(SKILL_KEYS):
+			# new skills were added to the game since this was saved
+			values += (0,) * (len(SKILL_KEYS) - len(values))
+		self.values = values
+		self._skills = tuple(Skill(self, i) for i in range(len(SKILL_KEYS)))
+
+	def _migrate(self):
+		"""
+		Convert skills stored as Traits contrib data into a skill vector.
+		"""
+		legacy = self.obj.attributes.get("skills", category="skills") or {}
+		values = []
+		for key in SKILL_KEYS:
+			trait = legacy.get(key) or {}
+			values.append(int((trait.get("base", 0) + trait.get("mod", 0)) * trait.get("mult", 1)))
+		values = tuple(values)
+		self.obj.attributes.add(self.attr_key, values)
+		if legacy:
+			self.obj.attributes.remove("skills", category="skills")
+		return values
+
+	@property
+	def all(self):
+		"""All of the skill keys, in order."""
+		return list(SKILL_KEYS)
+
+	def get(self, key):
+		"""
+		Get a skill by key, or None if there's no such skill.
+		"""
+		if (index := SKILL_INDEX.get(key.lower())) is None:
+			return None
+		return self._skills[index]
+
+	def __getitem__(self, key):
+		return self.get(key)
+
+	def set(self, key, value):
+		"""
+		Set a single skill's rating.
+		"""
+		self.update({key: value})
+
+	def update(self, values):
+		"""
+		Set any number of skill ratings from a {skill: rating} mapping, in one write.
+		"""
+		vector = list(self.values)
+		for key, value in values.items():
+			vector[SKILL_INDEX[key.lower()]] = int(value)
+		self.values = tuple(vector)
+		self.obj.attributes.add(self.attr_key, self.values)
+
+
+class AspectIndex:
+	"""
+	A case-folded trigram index over aspect texts, for substring matching
+	without scanning and lowercasing every aspect on each search.
+	"""
+	size = 3
+
+	def __init__(self, aspects=None):
+		self.rebuild(aspects or {})
+
+	def rebuild(self, aspects):
+		"""
+		Re-index a {slot: text} mapping.
+		"""
+		self.texts = dict(aspects)
+		self.folded = {key: str(text).casefold() for key, text in self.texts.items()}
+		self.order = {key: i for i, key in enumerate(self.texts)}
+		grams = {}
+		for key, text in self.folded.items():
+			for i in range(len(text) - self.size + 1):
+				grams.setdefault(text[i:i+self.size], set()).add(key)
+		self.grams = grams
+
+	def search(self, text):
+		"""
+		Get all (slot, text) pairs whose text contains `text`, ignoring case.
+		"""
+		text = text.casefold()
+		if len(text) < self.size:
+			candidates = self.folded.keys()
+		else:
+			candidates = None
+			for i in range(len(text) - self.size + 1):
+				keys = self.grams.get(text[i:i+self.size])
+				if not keys:
+					return []
+				candidates = set(keys) if candidates is None else candidates & keys
+				if not candidates:
+					return []
+			candidates = sorted(candidates, key=self.order.__getitem__)
+		return [(key, self.texts[key]) for key in candidates if text in self.folded[key]]
 
 
 class AspectHandler:
@@ -81,13 +201,21 @@ class AspectHandler:
 
 		self.refresh = data["refresh"]
 		self.aspects = dict(data["aspects"])
+		self.index = AspectIndex(self.aspects)
 	
 	def add(self, slot, text):
 		# high concept and trouble.
 		# three other aspects
 		# should probably do some validation or something here
 		self.aspects[slot] = text
-		self.obj.db._aspects["aspects"] = self.aspects
+		self.index.rebuild(self.aspects)
+		self.save()
+
+	def save(self):
+		"""
+		Write the handler's data back to the character.
+		"""
+		self.obj.attributes.add("_aspects", {"refresh": self.refresh, "aspects": self.aspects})
 	
 	def get(self, text):
 		"""
@@ -96,9 +224,7 @@ class AspectHandler:
 		Returns a list of tuples containing the aspect slot and
 		aspect text.
 		"""
-		text = text.lower()
-		result = [(key, value) for key, value in self.aspects.items() if text in value.lower()]
-		return result
+		return self.index.search(text)
 
 #	def __getattr__(self, attr):
 #		if attr == "refresh":
@@ -107,8 +233,132 @@ class AspectHandler:
 #			return self.aspects.get(attr)
 
 
+# consequence recovery states
+FRESH = 0
+RECOVERING = 1
+
+
 class StatusHandler:
-	pass
+	"""
+	Stores a character's stress and consequences as one small tuple:
+	a bitmask of checked boxes per stress track, where bit n is the box
+	absorbing n+1 shifts, then the mild, moderate and severe slots, each
+	either empty or a (text, recovery state) tuple.
+	"""
+	attr_key = "_status"
+
+	def __init__(self, obj):
+		self.obj = obj
+		data = obj.attributes.get(self.attr_key) or (0, 0, None, None, None)
+		self.stress = list(data[:len(TRACKS)])
+		self.consequences = list(data[len(TRACKS):])
+
+	def save(self):
+		"""
+		Write the status back to the character, in one write.
+		"""
+		self.obj.attributes.add(self.attr_key, (*self.stress, *self.consequences))
+
+	def boxes(self, track):
+		"""How many stress boxes the character has on a track."""
+		index = TRACKS.index(track)
+		return stress_boxes(self.obj.skills[TRACK_SKILLS[index]].value)
+
+	def free_stress(self, track):
+		"""
+		Get the unchecked boxes on a track, as a bitmask.
+		"""
+		index = TRACKS.index(track)
+		return ((1 << self.boxes(track)) - 1) & ~self.stress[index]
+
+	def check_box(self, track, value, save=True):
+		"""
+		Check the stress box that absorbs `value` shifts. Pass save=False
+		to save along with other changes.
+
+		Returns False if there's no such free box.
+		"""
+		bit = 1 << (value - 1)
+		if not self.free_stress(track) & bit:
+			return False
+		self.stress[TRACKS.index(track)] |= bit
+		if save:
+			self.save()
+		return True
+
+	def clear_stress(self, track=None, save=True):
+		"""
+		Clear the stress on a track, or on all of them, e.g. at the end
+		of a conflict. Pass save=False to save along with other changes.
+		"""
+		indexes = range(len(TRACKS)) if track is None else (TRACKS.index(track),)
+		if any(self.stress[index] for index in indexes):
+			for index in indexes:
+				self.stress[index] = 0
+			if save:
+				self.save()
+
+	def free_consequences(self):
+		"""
+		Get the empty consequence slots, as a bitmask in CONSEQUENCES order.
+		"""
+		return sum(1 << i for i, consequence in enumerate(self.consequences) if consequence is None)
+
+	def hit_options(self, track, shifts):
+		"""
+		Get the ways to absorb a hit of `shifts` on a track; see
+		`conflict.hits`. An empty tuple means the character is taken out.
+		"""
+		return hit_options(self.free_stress(track), self.free_consequences(), shifts)
+
+	def take_consequence(self, slot, text, save=True):
+		"""
+		Fill an empty consequence slot. Pass save=False to save along
+		with other changes.
+
+		Returns False if the slot is already taken.
+		"""
+		index = CONSEQUENCES.index(slot)
+		if self.consequences[index] is not None:
+			return False
+		self.consequences[index] = (text, FRESH)
+		if save:
+			self.save()
+		get_recovery().add(self.obj, slot)
+		return True
+
+	def recover(self, slot):
+		"""
+		Move a consequence along its recovery: a fresh consequence starts
+		recovering, and a recovering one clears.
+
+		Returns the consequence's new state, or None once it's cleared.
+		"""
+		index = CONSEQUENCES.index(slot)
+		if not (consequence := self.consequences[index]):
+			return None
+		text, state = consequence
+		if state == FRESH:
+			self.consequences[index] = (text, RECOVERING)
+		else:
+			self.consequences[index] = None
+		self.save()
+		return self.consequences[index] and RECOVERING
+
+	def display(self):
+		"""
+		Describe the stress tracks and consequences for the character sheet.
+		"""
+		lines = []
+		for index, track in enumerate(TRACKS):
+			checked = self.stress[index]
+			boxes = " ".join("[|rX|n]" if checked >> n & 1 else f"[{n+1}]" for n in range(self.boxes(track)))
+			lines.append(f"{track.title()} stress: {boxes}")
+		for slot, consequence in zip(CONSEQUENCES, self.consequences):
+			if consequence:
+				text, state = consequence
+				lines.append(f"{slot.title()}: {text}" + (" (recovering)" if state == RECOVERING else ""))
+		return "\n ".join(lines)
 
 
 
@@ -130,7 +380,7 @@ class CmdCharSheet(Command):
 	def func(self):
 		if hasattr(self.caller, "skills"):
 			skills = [self.caller.skills.get(key) for key in self.caller.skills.all]
-			skill_strs = [f"{skill.name}: {skill.desc()}" for skill in skills]
+			skill_strs = [f"{skill.name}: {LADDER.cdesc(skill.value)}" for skill in skills]
 			skills = "\n ".join(skill_strs)
 			self.caller.msg(f"Skills:\n {skills}\n")
 		else:
@@ -141,3 +391,6 @@ class CmdCharSheet(Command):
 			self.caller.msg(f"Aspects: {list_to_string(aspects)}\n")
 		else:
 			self.caller.msg("You have no aspects.\n")
+
+		if hasattr(self.caller, "status"):
+			self.caller.msg(f"Status:\n {self.caller.status.display()}\n")
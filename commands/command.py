@@ -46,17 +46,14 @@ class CmdPartyChat(Command):
 
         if group := caller.ndb.group:
             if self.cmdstring in self.aliases:
-                receivers = group.members
+                receivers = None
             else:
-                receivers = [player for player in group.members if player.location == caller.location]
-            message = self.args.strip()
-            message = "|Y{account}: {message}".format(account=caller.account.name, message=self.args.strip()
+                receivers = group.present(caller.location)
+            message = "|Y{account}: {message}".format(account=caller.account.name, message=self.args.strip())
+            group.broadcast(message, receivers=receivers)
         else:
-            receivers = caller
-            message = "Nothing happens."
+            caller.msg("Nothing happens.")
 
-        for receiver in receivers:
-            receiver.msg(message)
 # -------------------------------------------------------------
 #
 # The default commands inherit from
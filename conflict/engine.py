@@ -0,0 +1,67 @@
+"""
+Conflicts
+
+A conflict is a fight, physical or mental, between two or more sides.
+This module tracks who is on which side and whose turn it is; it doesn't
+message anyone or touch the database, so the same engine runs conflicts
+that players see and ones nobody does.
+"""
+from .turns import TurnOrder
+
+
+class Conflict:
+	def __init__(self, kind="physical", location=None):
+		"""
+		Args:
+			kind (str): "physical" or "mental", which decides initiative
+			location (obj, optional): where the conflict is happening
+		"""
+		self.kind = kind
+		self.location = location
+		self.turns = TurnOrder(kind)
+		self.sides = {}
+		self.current = None
+		# how many turns have been started
+		self.turn = 0
+
+	def join(self, participant, side, values=None):
+		"""
+		Add a participant on a side. Anything hashable names a side, e.g.
+		a group. Joining mid-conflict, they act from the next round.
+		"""
+		self.sides[participant] = side
+		self.turns.add(participant, values)
+
+	def leave(self, participant):
+		"""
+		Take a participant out of the conflict, e.g. when taken out or conceding.
+		"""
+		self.sides.pop(participant, None)
+		self.turns.remove(participant)
+		if participant is self.current:
+			self.current = None
+
+	@property
+	def round(self):
+		return self.turns.round
+
+	def next_turn(self):
+		"""
+		Move on to whoever acts next, and return them.
+		"""
+		self.current = self.turns.next_turn()
+		self.turn += 1
+		return self.current
+
+	def opponents(self, participant):
+		"""
+		Get everyone who isn't on the participant's side.
+		"""
+		side = self.sides.get(participant)
+		return [other for other, other_side in self.sides.items() if other_side != side]
+
+	def is_over(self):
+		"""
+		A conflict is over once fewer than two sides are left in it.
+		"""
+		return len(set(self.sides.values())) < 2
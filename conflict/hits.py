@@ -0,0 +1,109 @@
+"""
+Getting hit
+
+Works out the ways a character can absorb an incoming hit: a stress box,
+consequences plus a lower stress box, consequences alone, or conceding.
+Only options that absorb the whole hit are offered, and only minimal
+ones, where nothing in the option could be left out and still absorb it.
+If nothing can absorb the hit, there are no options and the character is
+taken out.
+
+The options only depend on the free stress boxes, the free consequence
+slots and the size of the hit, so they're memoized on exactly that.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+# stress tracks, and the skill that adds boxes to each
+TRACKS = ("physical", "mental")
+TRACK_SKILLS = ("physique", "will")
+
+# consequence slots, and how many shifts each absorbs
+CONSEQUENCES = ("mild", "moderate", "severe")
+CONSEQUENCE_SHIFTS = (2, 4, 6)
+
+# the consequence each slot gives, by the track
+CONSEQUENCE_TEXTS = {
+	"physical": ("Bruised", "Badly Wounded", "Crippled"),
+	"mental": ("Rattled", "Shaken", "Broken"),
+}
+
+# an option which absorbs a hit: the stress box to check (0 for none) and
+# the consequence slots to fill, as a bitmask in CONSEQUENCES order
+HitOption = namedtuple("HitOption", ("box", "consequences"))
+
+CONCEDE = "concede"
+
+
+def stress_boxes(rating):
+	"""
+	How many stress boxes a track gets for the rating of its skill: two,
+	a third at Average or Fair, and a fourth at Good and up.
+	"""
+	if rating >= 3:
+		return 4
+	if rating >= 1:
+		return 3
+	return 2
+
+
+def _slots(mask):
+	return [i for i in range(len(CONSEQUENCES)) if mask >> i & 1]
+
+
+@lru_cache(maxsize=None)
+def hit_options(stress_mask, consequence_mask, shifts):
+	"""
+	Get every minimal way to absorb a hit.
+
+	Args:
+		stress_mask (int): the free stress boxes, where bit n is the box
+			absorbing n+1 shifts
+		consequence_mask (int): the free consequence slots
+		shifts (int): the size of the hit
+
+	Returns:
+		tuple: HitOptions, followed by CONCEDE, or empty if the hit
+			can't be absorbed
+	"""
+	if shifts <= 0:
+		return ()
+
+	boxes = [n+1 for n in range(stress_mask.bit_length()) if stress_mask >> n & 1]
+
+	def smallest_box(needed):
+		return next((box for box in boxes if box >= needed), 0)
+
+	options = []
+	if box := smallest_box(shifts):
+		options.append(HitOption(box, 0))
+
+	for used in range(1, 1 << len(CONSEQUENCES)):
+		if used & ~consequence_mask:
+			continue
+		slots = _slots(used)
+		absorbed = sum(CONSEQUENCE_SHIFTS[i] for i in slots)
+		box = 0
+		if absorbed < shifts and not (box := smallest_box(shifts - absorbed)):
+			continue
+		# every consequence has to be pulling its weight
+		if any(absorbed - CONSEQUENCE_SHIFTS[i] + box >= shifts for i in slots):
+			continue
+		options.append(HitOption(box, used))
+
+	if options:
+		options.append(CONCEDE)
+	return tuple(options)
+
+
+def describe_option(option):
+	"""
+	Describe an option for the hit menu.
+	"""
+	if option == CONCEDE:
+		return "Concede the conflict"
+	parts = [f"take a {CONSEQUENCES[i]} consequence" for i in _slots(option.consequences)]
+	if option.box:
+		parts.append(f"check your {option.box}-point stress box")
+	text = " and ".join(parts)
+	return text[0].upper() + text[1:]
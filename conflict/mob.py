@@ -0,0 +1,122 @@
+"""
+Mobs
+
+A mob is a group of nameless minions that act as one. Rather than one
+character per minion, a mob keeps all of its minions in a few flat
+arrays: their skill vectors back to back, their stress box counts and
+checked boxes, and a bitmask of who has been taken out. The mob attacks
+and defends as one, at its group rating, and its defences against
+several attacks come from a single dice batch.
+
+This is plain data, so the same mob can be fought by players through the
+Mob typeclass or off-screen by the conflict simulator.
+"""
+from world.dice import DICE
+from world.odds import teamwork_bonus
+from world.skills import SKILL_INDEX, SKILL_KEYS
+
+SKILL_COUNT = len(SKILL_KEYS)
+
+
+class MobState:
+	def __init__(self, skills=(), boxes=(), stress=(), out=0):
+		"""
+		Args:
+			skills (tuple): every minion's skill vector, back to back
+			boxes (tuple): how many stress boxes each minion has
+			stress (tuple): each minion's checked stress boxes, as a bitmask
+				where bit n is the box absorbing n+1 shifts
+			out (int): bitmask of the minions that have been taken out
+		"""
+		self.skills = tuple(skills)
+		self.boxes = tuple(boxes)
+		self.stress = list(stress) or [0] * len(self.boxes)
+		self.out = out
+
+	@classmethod
+	def build(cls, size, skills=None, boxes=1):
+		"""
+		Make a mob of `size` identical minions.
+
+		Args:
+			size (int): how many minions
+			skills (dict): {skill: rating} for the minions
+			boxes (int): how many stress boxes each minion has
+		"""
+		skills = {skill.lower(): rating for skill, rating in (skills or {}).items()}
+		vector = tuple(int(skills.get(key, 0)) for key in SKILL_KEYS)
+		return cls(vector * size, (boxes,) * size)
+
+	@classmethod
+	def from_data(cls, data):
+		return cls(data["skills"], data["boxes"], data["stress"], data["out"])
+
+	def to_data(self):
+		"""Get the mob as plain, storable data."""
+		return {"skills": self.skills, "boxes": self.boxes, "stress": tuple(self.stress), "out": self.out}
+
+	@property
+	def size(self):
+		return len(self.boxes)
+
+	def active(self):
+		"""Get the indexes of the minions still in the fight."""
+		out = self.out
+		return [i for i in range(self.size) if not out >> i & 1]
+
+	def rating(self, minion, skill):
+		return self.skills[minion * SKILL_COUNT + SKILL_INDEX[skill.lower()]]
+
+	def group_rating(self, skill):
+		"""
+		The mob's rating when acting together: the best minion's rating,
+		plus +1 for every other minion, capped at that rating.
+		"""
+		if not (active := self.active()):
+			return None
+		ratings = sorted((self.rating(i, skill) for i in active), reverse=True)
+		return ratings[0] + teamwork_bonus(ratings[0], len(ratings) - 1)
+
+	def attack(self, skill, dice=None):
+		"""
+		Roll the mob's attack with `skill`. The minions act as one, so the
+		mob makes a single attack at its group rating.
+
+		Returns the result, or None if no minions are left.
+		"""
+		if (rating := self.group_rating(skill)) is None:
+			return None
+		return rating + (dice or DICE).roll()[1]
+
+	def defend(self, skill, attacks, dice=None):
+		"""
+		Roll the mob's defence against `attacks` incoming attacks at once.
+
+		Returns a list of results, one per attack.
+		"""
+		if (rating := self.group_rating(skill)) is None:
+			return []
+		return [rating + total for total in (dice or DICE).totals(attacks)]
+
+	def take_hit(self, shifts):
+		"""
+		Apply a hit to the mob. Each minion soaks what it can; shifts left
+		over after taking one out carry on to the next.
+
+		Returns a list of the indexes of the minions taken out.
+		"""
+		taken_out = []
+		for i in self.active():
+			if shifts <= 0:
+				break
+			free = [n+1 for n in range(self.boxes[i]) if not self.stress[i] >> n & 1]
+			if free and shifts <= free[-1]:
+				# the smallest box that can take it soaks the whole hit
+				box = next(value for value in free if value >= shifts)
+				self.stress[i] |= 1 << (box - 1)
+				return taken_out
+			# one more shift than the biggest box takes the minion out
+			shifts -= (free[-1] if free else 0) + 1
+			self.out |= 1 << i
+			taken_out.append(i)
+		return taken_out
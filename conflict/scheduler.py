@@ -0,0 +1,150 @@
+"""
+Conflict scheduler
+
+A single global script runs the turns of every active conflict. Each
+conflict's turn deadline sits on one heap, so a tick only looks at the
+turns that are actually due, and everything said in a room during a tick
+goes out as one message.
+
+The scheduler is set up in GLOBAL_SCRIPTS in the settings and is reached
+with `get_scheduler()`. Conflicts live in memory and don't survive a reload.
+"""
+import heapq
+from itertools import count
+from time import time
+
+from evennia import DefaultScript
+from evennia.utils import lazy_property
+
+# how long a participant has to act, in seconds, before their turn is skipped
+TURN_TIMEOUT = 60
+
+
+def get_scheduler():
+	"""
+	Get the global conflict scheduler.
+	"""
+	from evennia import GLOBAL_SCRIPTS
+	return GLOBAL_SCRIPTS.conflict_scheduler
+
+
+class ConflictScheduler(DefaultScript):
+	"""
+	Global script which advances the turns of all active conflicts.
+	"""
+	@lazy_property
+	def _state(self):
+		"""
+		The active conflicts, the heap of (deadline, order, conflict, turn)
+		entries, the room messages waiting for the end of the tick, and the
+		distinct conflicts advanced during it.
+		"""
+		return {
+			"active": set(),
+			"deadlines": [],
+			"order": count(),
+			"outbox": {},
+			"advanced": set(),
+			"turns_done": 0,
+			"last_tick": time(),
+			"rates": (0.0, 0.0),
+		}
+
+	def start(self, conflict):
+		"""
+		Start running a conflict.
+		"""
+		state = self._state
+		if conflict in state["active"]:
+			return
+		state["active"].add(conflict)
+		self.announce(conflict, "A conflict begins!")
+		self.advance(conflict)
+
+	def end(self, conflict):
+		"""
+		Stop running a conflict. Its stale deadline is dropped when it comes up.
+		"""
+		state = self._state
+		if conflict in state["active"]:
+			state["active"].discard(conflict)
+			self.announce(conflict, "The conflict is over.")
+
+	def act(self, conflict, participant):
+		"""
+		Call when a participant has finished their turn, to move on to the next.
+		"""
+		if conflict in self._state["active"] and conflict.current is participant:
+			self.advance(conflict)
+
+	def advance(self, conflict):
+		"""
+		Start the next turn of a conflict, or end it if it's over.
+		"""
+		state = self._state
+		state["advanced"].add(conflict)
+		if conflict.is_over() or (actor := conflict.next_turn()) is None:
+			self.end(conflict)
+			return
+
+		state["turns_done"] += 1
+		heapq.heappush(
+			state["deadlines"], (time() + TURN_TIMEOUT, next(state["order"]), conflict, conflict.turn)
+		)
+		self.announce(conflict, f"Round {conflict.round}: it is {actor}'s turn.")
+
+	def announce(self, conflict, text):
+		"""
+		Queue a message to the conflict's location, sent at the end of the tick.
+		"""
+		if location := conflict.location:
+			self._state["outbox"].setdefault(location, []).append(text)
+
+	def at_repeat(self, **kwargs):
+		"""
+		Skip every turn whose time is up, then send the tick's messages.
+		"""
+		state = self._state
+		now = time()
+		deadlines = state["deadlines"]
+		while deadlines and deadlines[0][0] <= now:
+			_, _, conflict, turn = heapq.heappop(deadlines)
+			if conflict not in state["active"] or turn != conflict.turn:
+				# the conflict has ended or moved on since this was scheduled
+				continue
+			self.announce(conflict, f"{conflict.current} hesitates, and the moment passes.")
+			self.advance(conflict)
+
+		self.flush()
+
+		elapsed = max(now - state["last_tick"], 1e-6)
+		state["rates"] = (len(state["advanced"]) / elapsed, state["turns_done"] / elapsed)
+		state["advanced"].clear()
+		state["turns_done"] = 0
+		state["last_tick"] = now
+
+	def flush(self):
+		"""
+		Send each room everything that was announced there, as one message.
+		"""
+		outbox = self._state["outbox"]
+		for location, lines in outbox.items():
+			location.msg_contents("\n".join(lines))
+		outbox.clear()
+
+	def stats(self):
+		"""
+		Get how busy the scheduler is.
+
+		Returns:
+			dict: the number of active conflicts, and how many distinct
+				conflicts and how many turns were advanced per second over
+				the last tick
+		"""
+		state = self._state
+		conflicts, turns = state["rates"]
+		return {
+			"active": len(state["active"]),
+			"conflicts_per_second": conflicts,
+			"turns_per_second": turns,
+		}
@@ -0,0 +1,270 @@
+"""
+Off-screen conflicts
+
+Runs whole conflicts between NPCs and mobs with nobody watching, e.g. a
+raid between two towns. Fighters are copied out of their objects up
+front, and the fight runs on that plain data: no typeclass hooks, no
+database, no messages. Only the outcome is written back to the objects
+at the end. That means a fight can run in a worker thread, and a batch
+of them across a process pool.
+
+Run this module directly for a benchmark:
+
+	python -m conflict.simulate
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from world.dice import DiceStream
+from world.skills import SKILL_INDEX, SKILL_KEYS
+
+from .engine import Conflict
+from .hits import CONCEDE, CONSEQUENCES, CONSEQUENCE_TEXTS, TRACK_SKILLS, TRACKS, hit_options, stress_boxes
+from .mob import SKILL_COUNT, MobState
+
+# the skills used to attack and to defend in each kind of conflict
+ATTACKS = {
+	"physical": ("fight", "athletics"),
+	"mental": ("provoke", "will"),
+}
+
+# a conflict still going after this many rounds is a stalemate
+MAX_ROUNDS = 100
+
+# winner is the side left standing, or None for a stalemate
+Outcome = namedtuple("Outcome", ("kind", "winner", "rounds", "exchanges", "fighters"))
+
+
+class Fighter:
+	"""
+	One NPC in an off-screen conflict.
+	"""
+	def __init__(self, key, values, boxes, stress=0, free=0b111):
+		"""
+		Args:
+			key: identifies the fighter when writing back, e.g. an object id
+			values (tuple): the skill vector
+			boxes (int): how many stress boxes they have on the conflict's track
+			stress (int): their checked stress boxes, as a bitmask
+			free (int): their free consequence slots, as a bitmask
+		"""
+		self.key = key
+		self.values = tuple(values)
+		self.boxes = boxes
+		self.stress = stress
+		self.free = free
+		# consequences taken during this conflict
+		self.taken = 0
+		self.out = False
+
+	@classmethod
+	def from_skills(cls, key, skills, kind="physical"):
+		"""
+		Make a fresh fighter from a {skill: rating} dict.
+		"""
+		skills = {skill.lower(): rating for skill, rating in skills.items()}
+		values = tuple(int(skills.get(skill, 0)) for skill in SKILL_KEYS)
+		return cls(key, values, stress_boxes(values[SKILL_INDEX[TRACK_SKILLS[TRACKS.index(kind)]]]))
+
+	@classmethod
+	def from_character(cls, character, kind="physical"):
+		"""
+		Copy a character's skills and status for an off-screen conflict.
+		"""
+		status = character.status
+		return cls(character.id, character.skills.values, status.boxes(kind),
+			status.stress[TRACKS.index(kind)], status.free_consequences())
+
+	def initiative(self):
+		return self.values
+
+	def attack(self, skill, dice):
+		return self.values[SKILL_INDEX[skill]] + dice.roll()[1]
+
+	def defend(self, skill, dice):
+		return self.values[SKILL_INDEX[skill]] + dice.roll()[1]
+
+	def take_hit(self, shifts):
+		"""
+		Absorb a hit as cheaply as possible. NPCs never concede.
+
+		Returns False if the hit takes them out.
+		"""
+		free_stress = ((1 << self.boxes) - 1) & ~self.stress
+		options = [option for option in hit_options(free_stress, self.free, shifts) if option != CONCEDE]
+		if not options:
+			self.out = True
+			return False
+		# the least severe consequences first, then the smallest box
+		option = min(options, key=lambda option: (option.consequences, option.box))
+		if option.box:
+			self.stress |= 1 << (option.box - 1)
+		self.free &= ~option.consequences
+		self.taken |= option.consequences
+		return True
+
+	def write_back(self, character, kind):
+		"""
+		Save the end of the conflict to the character it was copied from,
+		in one write. Stress clears once a conflict is over, so only the
+		consequences taken are kept.
+		"""
+		status = character.status
+		status.clear_stress(kind, save=False)
+		for i, slot in enumerate(CONSEQUENCES):
+			if self.taken >> i & 1:
+				status.take_consequence(slot, CONSEQUENCE_TEXTS[kind][i], save=False)
+		status.save()
+
+
+class MobFighter:
+	"""
+	A mob in an off-screen conflict, acting as one.
+	"""
+	def __init__(self, key, mob):
+		"""
+		Args:
+			key: identifies the mob when writing back, e.g. an object id
+			mob (MobState): the minions
+		"""
+		self.key = key
+		self.mob = mob
+		self.out = not mob.active()
+
+	@classmethod
+	def from_mob(cls, mob):
+		"""
+		Copy a Mob object's minions for an off-screen conflict.
+		"""
+		return cls(mob.id, MobState.from_data(mob.mob.to_data()))
+
+	def initiative(self):
+		first = self.mob.active()[0]
+		return self.mob.skills[first * SKILL_COUNT:(first + 1) * SKILL_COUNT]
+
+	def attack(self, skill, dice):
+		return self.mob.attack(skill, dice)
+
+	def defend(self, skill, dice):
+		return self.mob.defend(skill, 1, dice)[0]
+
+	def take_hit(self, shifts):
+		self.mob.take_hit(shifts)
+		self.out = not self.mob.active()
+		return not self.out
+
+	def write_back(self, mob, kind):
+		mob.set_state(self.mob)
+
+
+def simulate(sides, kind="physical", seed=None, max_rounds=MAX_ROUNDS):
+	"""
+	Fight a conflict out to the end.
+
+	Args:
+		sides (dict): {side: [fighters]}, where fighters are Fighters or MobFighters
+		kind (str): "physical" or "mental"
+		seed (int, optional): seeds the dice, to replay a fight
+		max_rounds (int): rounds to go before calling a stalemate
+
+	Returns:
+		Outcome
+	"""
+	dice = DiceStream(seed)
+	choice = dice.rng.choice
+	attack, defend = ATTACKS[kind]
+
+	conflict = Conflict(kind)
+	fighters = []
+	for side, members in sides.items():
+		for fighter in members:
+			fighters.append(fighter)
+			if not fighter.out:
+				conflict.join(fighter, side, fighter.initiative())
+
+	exchanges = 0
+	while not conflict.is_over():
+		actor = conflict.next_turn()
+		if actor is None or conflict.round > max_rounds:
+			break
+		target = choice(conflict.opponents(actor))
+		exchanges += 1
+		shifts = actor.attack(attack, dice) - target.defend(defend, dice)
+		if shifts > 0 and not target.take_hit(shifts):
+			conflict.leave(target)
+
+	winner = next(iter(conflict.sides.values()), None) if conflict.is_over() else None
+	return Outcome(kind, winner, min(conflict.round, max_rounds), exchanges, fighters)
+
+
+def write_back(outcome, objects):
+	"""
+	Save an outcome to the objects that fought.
+
+	Args:
+		outcome (Outcome): from `simulate`
+		objects (dict): {fighter key: the object it was copied from}
+	"""
+	for fighter in outcome.fighters:
+		if obj := objects.get(fighter.key):
+			fighter.write_back(obj, outcome.kind)
+
+
+def run_in_thread(sides, kind="physical", seed=None):
+	"""
+	Fight a conflict in a worker thread.
+
+	Returns a Deferred firing with the Outcome back in the main thread,
+	where it's safe to `write_back`.
+	"""
+	from twisted.internet.threads import deferToThread
+	return deferToThread(simulate, sides, kind, seed)
+
+
+def _simulate(fight):
+	return simulate(*fight)
+
+
+def run_batch(fights, workers=None):
+	"""
+	Fight many conflicts across a process pool.
+
+	Args:
+		fights (iterable): (sides, kind, seed) tuples
+		workers (int, optional): how many processes, by default one per CPU
+
+	Returns:
+		list: an Outcome per fight, in order
+	"""
+	fights = list(fights)
+	with ProcessPoolExecutor(workers) as pool:
+		return list(pool.map(_simulate, fights, chunksize=max(1, len(fights) // 64)))
+
+
+def benchmark(count=2000, seed=0):
+	"""
+	Time a raid of five NPCs against a mob of twelve, `count` times over,
+	in this process and then across a process pool.
+	"""
+	def raid(n):
+		raiders = [
+			Fighter.from_skills(("raider", i), {"Fight": 3, "Athletics": 2, "Physique": 2, "Notice": 1})
+			for i in range(5)
+		]
+		mob = MobFighter("mob", MobState.build(12, {"Fight": 2, "Athletics": 2}, boxes=2))
+		return ({"raiders": raiders, "town": [mob]}, "physical", seed + n)
+
+	for label, run in (("serial", lambda fights: [_simulate(fight) for fight in fights]), ("pool", run_batch)):
+		fights = [raid(n) for n in range(count)]
+		start = perf_counter()
+		outcomes = run(fights)
+		elapsed = perf_counter() - start
+		exchanges = sum(outcome.exchanges for outcome in outcomes)
+		wins = sum(outcome.winner == "raiders" for outcome in outcomes)
+		print(f"{label}: {count} conflicts, {exchanges} exchanges in {elapsed:.2f}s "
+			f"({exchanges / elapsed:,.0f} exchanges/s); raiders won {wins}")
+
+
+if __name__ == "__main__":
+	benchmark()
@@ -0,0 +1,110 @@
+"""
+Turn order
+
+Conflicts go in initiative order. Physical conflicts compare Notice, then
+Athletics, then Physique; mental conflicts compare Empathy, then Rapport,
+then Will. The three ratings are packed into a single sort key once, when
+a participant joins, and turns come off a heap, so nobody's skills are
+read again and nothing is re-sorted between rounds.
+"""
+import heapq
+from itertools import count
+
+from world.ladder import LADDER
+from world.skills import SKILL_INDEX
+
+INITIATIVE = {
+	"physical": ("notice", "athletics", "physique"),
+	"mental": ("empathy", "rapport", "will"),
+}
+
+# bits given to each skill in a packed initiative key
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+
+# marks an entry whose participant has left
+_LEFT = object()
+
+
+def initiative_key(values, kind="physical"):
+	"""
+	Pack the initiative skills for a conflict type into one int, from a
+	skill vector. A higher key goes first.
+	"""
+	key = 0
+	for skill in INITIATIVE[kind]:
+		rating = values[SKILL_INDEX[skill]] - LADDER.low
+		key = (key << _BITS) | max(0, min(rating, _MASK))
+	return key
+
+
+class TurnOrder:
+	"""
+	The order of turns in a conflict, round after round.
+
+	Each participant has one heap entry, which moves from this round's heap
+	to the next round's when they act. Joining or leaving mid-conflict is
+	O(log n) and O(1) respectively; entries of those who left are dropped
+	as they come up.
+	"""
+	def __init__(self, kind="physical"):
+		self.kind = kind
+		self.round = 0
+		self._entries = {}
+		self._current = []
+		self._next = []
+		self._joined = count()
+
+	def __len__(self):
+		return len(self._entries)
+
+	def __contains__(self, participant):
+		return participant in self._entries
+
+	def add(self, participant, values=None):
+		"""
+		Add a participant, who takes their first turn next round.
+
+		Args:
+			participant: anything hashable, usually a character
+			values (tuple, optional): the participant's skill vector,
+				read from `participant.skills` if not given
+		"""
+		if participant in self._entries:
+			return
+		if values is None:
+			values = participant.skills.values
+		# ties go to whoever joined first
+		entry = [-initiative_key(values, self.kind), next(self._joined), participant]
+		self._entries[participant] = entry
+		heapq.heappush(self._next, entry)
+
+	def remove(self, participant):
+		"""
+		Take a participant out of the turn order.
+		"""
+		if entry := self._entries.pop(participant, None):
+			entry[2] = _LEFT
+
+	def next_turn(self):
+		"""
+		Get whoever acts next, starting a new round when everyone has
+		acted. Returns None if nobody is left.
+		"""
+		while True:
+			if not self._current:
+				if not self._entries:
+					return None
+				self._current, self._next = self._next, []
+				self.round += 1
+			entry = heapq.heappop(self._current)
+			if entry[2] is _LEFT:
+				continue
+			heapq.heappush(self._next, entry)
+			return entry[2]
+
+	def upcoming(self):
+		"""
+		Get the participants still to act this round, in order.
+		"""
+		return [entry[2] for entry in sorted(self._current) if entry[2] is not _LEFT]
@@ -1,4 +1,9 @@
-from world.skills import SKILL_LIST, THE_LADDER
+from world.ladder import LADDER
+from world.odds import check_odds
+from world.skills import SKILL_LIST
+
+# skill ratings to show the odds for while choosing a check level
+_ODDS_RATINGS = (1, 2, 3, 4)
 
 def menunode_start(caller):
 	target = caller.ndb.target
@@ -46,11 +51,13 @@ def menunode_set_level(caller, raw_string, skill, **kwargs):
 	target.ndb.menu_data["skill"] = skill
 
 	text = "How difficult is the {skill} check to {action} {target}?".format(**target.ndb.menu_data)
+	ratings = " / ".join(LADDER.desc(rating) for rating in _ODDS_RATINGS)
+	text += f"\n\n(Chance to at least tie the check at {ratings} {skill} is shown beside each level.)"
 
 	options = []
-	max_skill = list(THE_LADDER.keys())[-1]
-	for level in range(max_skill+1):
-		options.append({"key": str(level), "desc": THE_LADDER[level], "goto": (_permanence_check, { "level": level })})
+	for level, name in LADDER.levels(0):
+		odds = " / ".join(f"{1 - check_odds(rating, level).fail:.0%}" for rating in _ODDS_RATINGS)
+		options.append({"key": str(level), "desc": f"{name} ({odds})", "goto": (_permanence_check, { "level": level })})
 	
 	return text, options
 
@@ -65,7 +72,7 @@ def _permanence_check(caller, raw_string, level, **kwargs):
 
 	action = target.ndb.menu_data["action"]
 
-	if check := target.attributes.get(f"{action}_check"):
+	if check := target.checks.get(f"{action}_check"):
 		if oneshot := check.get("oneshot"):
 			return (_desc_check, { "oneshot": oneshot })
 
@@ -92,7 +99,7 @@ def _desc_check(caller, raw_string, oneshot, **kwargs):
 	
 	attr_name = f"{action}_passive_check" if target.ndb.menu_data['passive'] else f"{action}_check"
 
-	if check := target.attributes.get(attr_name):
+	if check := target.checks.get(attr_name):
 		if desc := check.get("desc"):
 			return ("menunode_done", { "desc": desc })
 	
@@ -124,7 +131,7 @@ def menunode_done(caller, raw_string, **kwargs):
 	if not desc:
 		desc = raw_string.strip()
 	
-	if check := target.attributes.get(attr_check):
+	if check := target.checks.get(attr_check):
 		if desc:
 			check["desc"] = desc
 		check["skills"][skill] = level
@@ -147,9 +154,9 @@ def menunode_done(caller, raw_string, **kwargs):
 				lockstring = f"{action}:skillcheck({attr_check})"
 			target.locks.add(lockstring)
 		
-	target.attributes.add(attr_check, check)
+	target.checks.set(attr_check, check)
 	caller.nattributes.remove("target")
 
-	text = f"The {action} action on {target.get_display_name(caller)} will now require {THE_LADDER[level]} {skill}."
+	text = f"The {action} action on {target.get_display_name(caller)} will now require {LADDER.desc(level)} {skill}."
 	
 	return text, None
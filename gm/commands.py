@@ -1,29 +1,7 @@
 from evennia import CmdSet
 from evennia.utils.evmenu import EvMenu
 from commands.command import Command
-from world.skills import SKILL_LIST, THE_LADDER
-
-# Helper functions
-def roll():
-	roll_list = [randint(-1,1) for i in range(4)]
-	strings = []
-	for result in roll_list:
-		if result == -1:
-			strings.append('[|r-|n]')
-		elif result == 0:
-			strings.append('[ ]')
-		elif result == 1:
-			strings.append('[|g+|n]')
-		
-	return (" ".join(strings), sum(roll_list))
-
-def desc(value):
-		highest = ""
-		for bound, txt in THE_LADDER.items():
-			highest = txt
-			if value <= bound:
-				return txt
-		return highest
+from conflict.scheduler import get_scheduler
 
 
 class CmdSetSkillcheck(Command):
@@ -56,6 +34,24 @@ class CmdSetSkillcheck(Command):
 		EvMenu(caller, 'gm.check_menu', startnode="menunode_start", cmd_on_exit=None)
 
 
+class CmdConflictStats(Command):
+	"""
+	Show how busy the conflict scheduler is.
+
+	Usage:
+	  conflicts
+	"""
+	key = "conflicts"
+	locks = "cmd:perm(Builder)"
+
+	def func(self):
+		stats = get_scheduler().stats()
+		self.caller.msg(
+			"{active} active conflicts, {conflicts_per_second:.1f} conflicts and "
+			"{turns_per_second:.1f} turns processed per second.".format(**stats)
+		)
+
+
 class FateGMCmdSet(CmdSet):
 	"""
 	Collect all of the Fate character commands in one place,
@@ -63,3 +59,4 @@ class FateGMCmdSet(CmdSet):
 	"""
 	def at_cmdset_creation(self):
 		self.add(CmdSetSkillcheck())
+		self.add(CmdConflictStats())
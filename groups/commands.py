@@ -34,6 +34,32 @@ class CmdVoteYesNo(Command):
 
 		
 
+class CmdAssist(Command):
+	"""
+	Answer a group member's request for help with a skill check.
+
+	Usage:
+	  assist
+	  pass
+	"""
+	key = "assist"
+	aliases = ("pass",)
+	locks = "cmd:perm(Player)"
+
+	def func(self):
+		caller = self.caller
+		group = caller.ndb.group
+
+		if not group or not group.answer_assist(caller, self.cmdstring == "assist"):
+			caller.msg("Nobody needs your help right now.")
+			return
+
+		if self.cmdstring == "assist":
+			caller.msg("You lend a hand.")
+		else:
+			caller.msg("You stay out of it.")
+
+
 class GroupCmdSet(CmdSet):
 	key = "GroupCmdSet"
 
@@ -41,4 +67,5 @@ class GroupCmdSet(CmdSet):
 	def at_cmdset_creation(self):
 		super().at_cmdset_creation()
 		
-		self.add(CmdVoteYesNo())
\ No newline at end of file
+		self.add(CmdVoteYesNo())
+		self.add(CmdAssist())
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Group pool
+
+Hands out empty group scripts from an in-memory free list, so logins and
+splits don't each need a tag query and a script creation. The pool is
+filled from the database once at server start, topped up a few scripts at
+a time on later reactor ticks, and trimmed when too many groups empty out.
+"""
+from evennia.utils import search, create, delay
+
+GROUP_TYPECLASS = "groups.script.GroupScript"
+
+# how many empty groups to keep ready
+POOL_MIN = 10
+# empty groups past this many are deleted instead of pooled
+POOL_MAX = 50
+# how many groups to create per tick while refilling
+REFILL_BATCH = 5
+
+
+class GroupPool:
+	def __init__(self):
+		self.free = []
+		self._refilling = False
+
+	def warm(self):
+		"""
+		Load all of the empty groups in one query, then bring the pool
+		within its limits.
+		"""
+		self.free = list(search.search_script_tag("empty", category="group"))
+		self._trim()
+		self._schedule_refill()
+
+	def acquire(self):
+		"""
+		Get an empty group to put players in.
+		"""
+		if self.free:
+			group = self.free.pop()
+			group.tags.remove("empty", category="group")
+		else:
+			group = create.script(typeclass=GROUP_TYPECLASS)
+		self._schedule_refill()
+		return group
+
+	def release(self, group):
+		"""
+		Return a group that no longer has any members.
+		"""
+		if group in self.free:
+			return
+		if len(self.free) >= POOL_MAX:
+			group.delete()
+			return
+		group.tags.add("empty", category="group")
+		self.free.append(group)
+
+	def refill(self):
+		"""
+		Create a batch of empty groups, continuing on the next tick
+		until the pool is back to its minimum.
+		"""
+		self._refilling = False
+		for _ in range(min(REFILL_BATCH, POOL_MIN - len(self.free))):
+			group = create.script(typeclass=GROUP_TYPECLASS)
+			group.tags.add("empty", category="group")
+			self.free.append(group)
+		self._schedule_refill()
+
+	def _schedule_refill(self):
+		if not self._refilling and len(self.free) < POOL_MIN:
+			self._refilling = True
+			delay(0, self.refill)
+
+	def _trim(self):
+		while len(self.free) > POOL_MAX:
+			self.free.pop().delete()
+
+
+GROUP_POOL = GroupPool()
@@ -1,27 +1,179 @@
+from django.db import transaction
+from twisted.internet import reactor
 from evennia import DefaultScript
-from evennia.utils import search, create
+from evennia.objects.models import ObjectDB
+from evennia.scripts.models import ScriptDB
+from evennia.utils import lazy_property, make_iter
 from evennia.typeclasses.attributes import AttributeProperty
-from .commands import GroupCmdSet
+from world.dice import stream, drop_stream
+from world.ladder import LADDER
+from world.odds import teamwork_bonus
+from world.timers import WHEEL
+from .pool import GROUP_POOL
+
+# how long a poll stays open, in seconds, before the votes cast so far are tallied
+POLL_TIMEOUT = 60
+# how long to gather votes, in seconds, before announcing the running
+# count, so votes coming in close together are announced once
+TALLY_DELAY = 2
+# how long helpers have to answer a request for teamwork, in seconds
+ASSIST_TIMEOUT = 30
 
 class GroupScript(DefaultScript):
 	"""
 	Global script that manages the members of a group.
 	"""
-	# mutable AttrProps have issues, so the default empty list is set in creation
-	members = AttributeProperty(default=[])
-	
-	def at_server_start(self):
+	# the persisted membership, only written when it changes
+	member_ids = AttributeProperty(default=())
+
+	@lazy_property
+	def _members(self):
+		"""
+		The group's members by id, loaded in one query.
+		"""
+		ids = self.member_ids
+		if not ids and (legacy := self.attributes.get("members")):
+			# convert from the old list of members
+			ids = tuple(player.id for player in legacy if player)
+			self.member_ids = ids
+			self.attributes.remove("members")
+		found = {player.id: player for player in ObjectDB.objects.filter(id__in=ids)}
+		return {pid: found[pid] for pid in ids if pid in found}
+
+	@property
+	def members(self):
+		"""A list of the group's members."""
+		return list(self._members.values())
+
+	@lazy_property
+	def _rooms(self):
+		"""
+		The group's members bucketed by the id of the room they're in,
+		along with each member's current room id.
+		"""
+		rooms, where = {}, {}
+		for player in self._members.values():
+			if location := player.location:
+				rooms.setdefault(location.id, set()).add(player)
+				where[player.id] = location.id
+		return rooms, where
+
+	def present(self, location):
+		"""
+		Get the members who are in `location`.
+		"""
+		if not location:
+			return frozenset()
+		rooms, _ = self._rooms
+		return frozenset(rooms.get(location.id, ()))
+
+	def relocate(self, player):
+		"""
+		Move a member into the bucket for their current location. Call
+		this whenever a member's location changes.
+		"""
+		rooms, where = self._rooms
+		if (old := where.pop(player.id, None)) is not None:
+			bucket = rooms[old]
+			bucket.discard(player)
+			if not bucket:
+				del rooms[old]
+		if self.has(player) and (location := player.location):
+			rooms.setdefault(location.id, set()).add(player)
+			where[player.id] = location.id
+
+	def has(self, player):
 		"""
-		Reloads party membership status on initialization.
+		Check if `player` is in the group.
 		"""
-		for player in self.members:
-			player.ndb.group = self
-			player.cmdset.add(GroupCmdSet)
+		return player.id in self._members
 
-	def at_script_creation(self):
-		# workaround for the mutable AttrProp issue
-		self.members = []
-		self.at_server_start()
+	def _save_members(self):
+		self.member_ids = tuple(self._members)
+
+	@lazy_property
+	def _sessions(self):
+		"""Each member's sessions by member id, resolved when first needed."""
+		return {}
+
+	@lazy_property
+	def _outbox(self):
+		"""Messages waiting to be sent, by session."""
+		return {}
+
+	def sessions_for(self, player):
+		"""
+		Get a member's sessions, resolving them only once until they change.
+		"""
+		if (sessions := self._sessions.get(player.id)) is None:
+			sessions = self._sessions[player.id] = tuple(player.sessions.all())
+		return sessions
+
+	def refresh_sessions(self, player=None):
+		"""
+		Forget the cached sessions of `player`, or of every member, e.g.
+		when they puppet or unpuppet.
+		"""
+		if player:
+			self._sessions.pop(player.id, None)
+		else:
+			self._sessions.clear()
+
+	def broadcast(self, text, receivers=None, exclude=None):
+		"""
+		Send a message to the online members of the group.
+
+		Everything broadcast during the same reactor tick is joined up
+		and pushed to each session in a single send. Call `flush` before
+		anything that must arrive after what's been broadcast.
+
+		Args:
+		  text (str)           : the message
+		  receivers (iterable) : the members to send to, defaults to all of them
+		  exclude (obj or list): members not to send to
+		"""
+		exclude = set(make_iter(exclude)) if exclude else ()
+		outbox = self._outbox
+		for player in self._members.values() if receivers is None else receivers:
+			if player in exclude:
+				continue
+			for session in self.sessions_for(player):
+				outbox.setdefault(session, []).append(text)
+
+		if outbox and not self.ndb.flush_call:
+			self.ndb.flush_call = reactor.callLater(0, self.flush)
+
+	def flush(self):
+		"""
+		Send everything waiting in the outbox.
+		"""
+		if (flush_call := self.ndb.flush_call) and flush_call.active():
+			flush_call.cancel()
+		self.nattributes.remove("flush_call")
+		outbox = self._outbox
+		for session, texts in outbox.items():
+			session.data_out(text="\n".join(texts))
+		outbox.clear()
+
+	@property
+	def dice(self):
+		"""The group's own dice stream, so a group's rolls can be seeded and replayed."""
+		return stream(self.id)
+
+	def at_stop(self, **kwargs):
+		super().at_stop(**kwargs)
+		drop_stream(self.id)
+	
+	def load_members(self, ids, players):
+		"""
+		Fill the member cache from characters that were already loaded.
+
+		Args:
+		  ids (tuple)   : the group's member ids, in order
+		  players (dict): loaded characters by id
+		"""
+		self.__dict__["_members"] = {pid: players[pid] for pid in ids if pid in players}
+		self.__dict__.pop("_rooms", None)
 
 	def add(self, player):
 		"""
@@ -30,7 +182,7 @@ class GroupScript(DefaultScript):
 		Returns True if player was successfully added or already in the
 		group, otherwise False
 		"""
-		if player in self.members:
+		if self.has(player):
 			return True
 		
 		# only active players can be added
@@ -40,9 +192,13 @@ class GroupScript(DefaultScript):
 		if player.ndb.group:
 			if not player.ndb.group.remove(player):
 				return False
-		self.members.append(player)
+		self._members[player.id] = player
+		self._save_members()
+		self.refresh_sessions(player)
+		self.relocate(player)
+		# the group commands are attached the next time the cmdsets are gathered
 		player.ndb.group = self
-		player.cmdset.add(GroupCmdSet)
+		return True
 
 	def remove(self, player):
 		"""
@@ -51,48 +207,74 @@ class GroupScript(DefaultScript):
 		Returns True if player was successfully removed or not in the
 		group, otherwise False
 		"""
-		if player not in self.members:
+		if not self.has(player):
 			return True
 
-		self.members.remove(player)
+		del self._members[player.id]
+		self._save_members()
+		self.refresh_sessions(player)
+		self.relocate(player)
 		player.ndb.group = None
-		player.cmdset.remove(GroupCmdSet)
 
-		if len(self.members) <= 0:
-			self.tags.add("empty", category="group")
+		if not self._members:
+			GROUP_POOL.release(self)
 		
 		return True
 
+	def transfer(self, players, destination):
+		"""
+		Move any number of members from this group into `destination`.
+
+		Both groups' memberships are saved once, together, however many
+		players move. Players who aren't in this group are skipped.
+		"""
+		moving = {player.id: player for player in players if self.has(player)}
+		if not moving or destination is self:
+			return
+
+		with transaction.atomic():
+			for pid, player in moving.items():
+				del self._members[pid]
+				self.relocate(player)
+				self.refresh_sessions(player)
+				destination._members[pid] = player
+				destination.relocate(player)
+				destination.refresh_sessions(player)
+				# the cmdsets follow the group the next time they're gathered
+				player.ndb.group = destination
+			self._save_members()
+			destination._save_members()
+			if not self._members:
+				GROUP_POOL.release(self)
+
 	def split(self, players):
 		"""
 		Split one or more players out of the party into a new one.
 		
-		Returns False if the players could not be split out, otherwise True
+		Returns False if the players could not be split out, otherwise
+		the group they are now in
 		"""
-		invalid = [player for player in players if player not in self.members]
-		if len(invalid) > 0:
+		players = list(players)
+		if not all(self.has(player) for player in players):
 			return False
 
-		if len(players) <= 0 or len(players) == self.members:
-			return True
-		
-		free = search.search_tag("empty", "group")
-		if len(free) > 0:
-			# there are available group scripts, use one
-			new_group = free[0]
-			new_group.tags.remove("empty", "group")
-		else:
-			# create a new group script
-			new_group = create.script(typeclass=GroupScript)
-
-		# move the listed players into the new group
-		new_group.members = players
-		# filter the listed players out of our group members 
-		self.members = [player for player in self.members if player not in players]
-		# change group assignment for listed players
-		for player in new_group.members:
-			player.ndb.group = new_group
+		if not players or len({player.id for player in players}) == len(self._members):
+			# there's nobody to split away from
+			return self
 		
+		new_group = GROUP_POOL.acquire()
+		self.transfer(players, new_group)
+		return new_group
+
+	def merge(self, other):
+		"""
+		Bring all of the members of another group into this one.
+
+		Returns True if the groups were merged, otherwise False
+		"""
+		if other is self:
+			return False
+		other.transfer(other.members, self)
 		return True
 	
 	def poll(self, pollee, action, query):
@@ -108,7 +290,7 @@ class GroupScript(DefaultScript):
 			False if poll could not be run, otherwise True
 		"""
 		# poll can't be triggered by someone outside the group
-		if pollee not in self.members:
+		if not self.has(pollee):
 			return False
 		
 		# can't start a new poll if one is already active
@@ -119,13 +301,13 @@ class GroupScript(DefaultScript):
 		self.ndb.poll = (pollee, query, action)
 		poll_msg = f"{pollee} wants to {query}.\nDo you approve?"
 
-		count = [voter.msg(poll_msg) for voter in self.ndb.voters if voter is not pollee]
-		if len(count) > 0:
+		if len(self.ndb.voters) > 1:
+			self.broadcast(poll_msg, receivers=self.ndb.voters, exclude=pollee)
 			pollee.msg(f"You attempt to {query}.")
+			self.ndb.poll_timer = WHEEL.schedule(POLL_TIMEOUT, self.expire_poll)
 		# poll-caller always automatically votes Yes
 		self.vote(pollee, True, quiet=True)
-
-
+		return True
 
 	def vote(self, voter, value, quiet=False):
 		"""
@@ -143,7 +325,10 @@ class GroupScript(DefaultScript):
 			self.ndb.voters[voter] = 1
 		else:
 			self.ndb.voters[voter] = -1
-		
+
+		if not quiet:
+			# the group only hears the running count once votes settle
+			voter.msg("Your vote is counted.")
 		self.check_votes(quiet=quiet)
 		return True
 
@@ -152,45 +337,195 @@ class GroupScript(DefaultScript):
 			# there's no vote happening
 			return
 
-		no_votes = [player for player, vote in self.ndb.voters.items() if not vote]
-		voters = self.ndb.voters.keys()
-		
-		remaining = len(no_votes)
-		if remaining > 0:
-			# there are still group members who haven't voted
-			if not quiet:
-				total = len(voters)
-				message = f"{total-remaining}/{total} votes tallied."
-				for voter in voters:
-					voter.msg(message)
+		if all(self.ndb.voters.values()):
+			# all members have voted
+			self.close_poll(quiet=quiet)
+
+		elif not quiet and not self.ndb.tally_call:
+			# there are still group members who haven't voted; let them
+			# know once the votes coming in together are all counted
+			self.ndb.tally_call = reactor.callLater(TALLY_DELAY, self.send_tally)
+
+	def send_tally(self):
+		"""
+		Tell the voters how many votes have been cast so far.
+		"""
+		self.nattributes.remove("tally_call")
+		if not self.ndb.voters:
+			return
+		voters = self.ndb.voters
+		total = len(voters)
+		remaining = sum(1 for vote in voters.values() if not vote)
+		self.broadcast(f"{total-remaining}/{total} votes tallied.", receivers=voters)
+
+	def expire_poll(self):
+		"""
+		Close the active poll when its deadline passes, with the votes cast so far.
+		"""
+		if not self.ndb.poll:
+			return
+		self.nattributes.remove("poll_timer")
+		self.broadcast("Time is up for the vote.", receivers=self.ndb.voters)
+		self.close_poll()
 
+	def close_poll(self, quiet=False):
+		"""
+		Tally the votes that have been cast and carry out the result.
+		"""
+		WHEEL.cancel(self.ndb.poll_timer)
+		if (tally_call := self.ndb.tally_call) and tally_call.active():
+			# the result supersedes the running count
+			tally_call.cancel()
+		voters = self.ndb.voters.keys()
+		pollee, query, action = self.ndb.poll
+		tally = sum(self.ndb.voters.values())
+		if tally > 0:
+			# vote is Yes
+			approve = True
+			message = f"Vote tallied: {pollee} can {query}."
+		elif tally < 0:
+			# vote is No
+			approve = False
+			message = f"Vote tallied: {pollee} cannot {query}."
 		else:
-			# all members have voted
-			pollee, query, action = self.ndb.poll
-			tally = sum(self.ndb.voters.values())
-			if tally > 0:
-				# vote is Yes
-				approve = True
-				message = f"Vote tallied: {pollee} can {query}."
-			elif tally < 0:
-				# vote is No
-				approve = False
-				message = f"Vote tallied: {pollee} cannot {query}."
-			else:
-				# vote is a tie!
-				# tiebreaker coin flip
-				approve, coin = (True, "Heads") if randint(0,1) else (False, "Tails")
-				message = f"The vote for {pollee} to {query} is tied. Heads for Yes, Tails for No.\nThe coin flip says: {coin}."
-
-			if not quiet:
-				for voter in voters:
-					voter.msg(message)
-
-			if approve:
-				# complete the pending action
-				callable, kwargs = action
-				callable(pollee, **kwargs)
-
-			self.nattributes.remove("poll")
-			self.nattributes.remove("voters")
-			
+			# vote is a tie!
+			# tiebreaker coin flip
+			approve, coin = (True, "Heads") if self.dice.rng.randint(0,1) else (False, "Tails")
+			message = f"The vote for {pollee} to {query} is tied. Heads for Yes, Tails for No.\nThe coin flip says: {coin}."
+
+		if not quiet:
+			self.broadcast(message, receivers=voters)
+
+		self.nattributes.remove("poll")
+		self.nattributes.remove("voters")
+		self.nattributes.remove("poll_timer")
+		self.nattributes.remove("tally_call")
+
+		if approve:
+			# the result has to go out before the action's own messages
+			self.flush()
+			# complete the pending action
+			callable, kwargs = action
+			callable(pollee, **kwargs)
+
+
+	@lazy_property
+	def _assists(self):
+		"""
+		Open requests for teamwork by the acting member's id, and the id
+		of the member each polled helper would be assisting.
+		"""
+		return {}, {}
+
+	def request_assist(self, actor, skill):
+		"""
+		Ask the idle members who are with `actor` to help with their
+		current check. Answers are collected until everyone has answered,
+		the teamwork cap is reached or the request times out, and then
+		the bonus is added to the check in one go.
+
+		Args:
+		  actor (obj): the member making the check
+		  skill (str): the skill being used
+
+		Returns:
+			False if nobody could be asked to help, otherwise True
+		"""
+		requests, helping = self._assists
+		if actor.id in requests:
+			return False
+
+		# only members who aren't busy with something else are asked
+		helpers = [
+			player for player in self.present(actor.location)
+			if player is not actor and player.id not in requests and player.id not in helping
+			and self.sessions_for(player) and not player.db.current_roll
+		]
+		# teamwork can't add more than the actor's skill rating
+		if not (cap := teamwork_bonus(actor.skills[skill].value, len(helpers))):
+			return False
+
+		requests[actor.id] = {
+			"actor": actor,
+			"skill": skill,
+			"cap": cap,
+			"pending": {player.id for player in helpers},
+			"helpers": [],
+			"timer": WHEEL.schedule(ASSIST_TIMEOUT, self.close_assist, actor),
+		}
+		for player in helpers:
+			helping[player.id] = actor.id
+
+		self.broadcast(f"{actor} is attempting a {skill} check. Will you |wassist|n or |wpass|n?", receivers=helpers)
+		return True
+
+	def answer_assist(self, helper, assist):
+		"""
+		Record a helper's answer to a request for teamwork.
+
+		Returns False if the helper wasn't asked to help with anything.
+		"""
+		requests, helping = self._assists
+		if (actor_id := helping.pop(helper.id, None)) is None:
+			return False
+
+		request = requests[actor_id]
+		request["pending"].discard(helper.id)
+		if assist:
+			request["helpers"].append(helper)
+
+		if len(request["helpers"]) >= request["cap"] or not request["pending"]:
+			# nothing more can change the result
+			self.close_assist(request["actor"])
+		return True
+
+	def close_assist(self, actor):
+		"""
+		Close a request for teamwork and apply the bonus to the actor's check.
+		"""
+		requests, helping = self._assists
+		if not (request := requests.pop(actor.id, None)):
+			return
+		WHEEL.cancel(request["timer"])
+		for pid in request["pending"]:
+			helping.pop(pid, None)
+
+		helpers = request["helpers"]
+		bonus = min(len(helpers), request["cap"])
+		if not bonus or not (check := actor.db.current_roll):
+			return
+
+		skill, result = check
+		result += bonus
+		actor.db.current_roll = (skill, result)
+		names = ", ".join(str(helper) for helper in helpers)
+		self.broadcast(
+			f"{names} assisted {actor} for +{bonus}. The {skill} check is now {LADDER.desc(result)}.",
+			receivers=[actor, *helpers],
+		)
+		# the bonus has to go out before the check is resolved
+		self.flush()
+
+
+def restore_groups():
+	"""
+	Reconnect every group to its members after the server starts.
+
+	All of the groups, their member ids and the members themselves are
+	loaded in three queries, however many groups there are. Members get
+	the group commands the first time their cmdsets are gathered, not here.
+	"""
+	groups = {group.id: group for group in GroupScript.objects.all()}
+	stored = dict(
+		ScriptDB.db_attributes.through.objects.filter(
+			scriptdb_id__in=groups, attribute__db_key="member_ids", attribute__db_category=None
+		).values_list("scriptdb_id", "attribute__db_value")
+	)
+	players = ObjectDB.objects.in_bulk({pid for ids in stored.values() for pid in ids})
+
+	for group_id, group in groups.items():
+		if (ids := stored.get(group_id)) is not None:
+			group.load_members(ids, players)
+		# groups saved in the old format convert themselves as they load
+		for player in group.members:
+			player.ndb.group = group
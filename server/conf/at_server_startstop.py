@@ -22,7 +22,13 @@ def at_server_start():
     This is called every time the server starts up, regardless of
     how it was shut down.
     """
-    pass
+    from characters.recovery import get_recovery
+    from groups.pool import GROUP_POOL
+    from groups.script import restore_groups
+
+    restore_groups()
+    GROUP_POOL.warm()
+    get_recovery().wake()
 
 
 def at_server_stop():
@@ -20,30 +20,26 @@ lock functions from evennia.locks.lockfuncs.
 
 """
 
+from world import checks
+
+
 def skillcheck(accessing_obj, accessed_obj, action_type, *args, **kwargs):
 	"""
 	Checks that the accessing object passes the required skill
 	check on the accessed object.
-	
+
 	Use only for passive checks.
 	"""
 	if not hasattr(accessing_obj, "skills"):
 		# accessing obj isn't part of the skill system at all
 		return True
 
-	if skill_check := accessed_obj.attributes.get(action_type):
-		# the check data is available
-		if skills := skill_check.get("skills"):
-			for skill, level in skills.items():
-				if accessing_obj.skills[skill.lower()].value >= level:
-					# pass the passive check
-					return True
-			# the loop is through and no skills passed
-			return False
-		else:
-			# for some reason no skills were set
-			return True
-	
-	else:
-		# there's no DC to check against, automatically pass
+	if not hasattr(accessed_obj, "checks"):
 		return True
+
+	if not (check := accessed_obj.checks.compiled(action_type)):
+		# there's no DC to check against, or for some reason no skills
+		# were set, so automatically pass
+		return True
+
+	return checks.passes(accessing_obj, check)
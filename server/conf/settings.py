@@ -34,8 +34,20 @@ from evennia.settings_default import *
 # This is the name of your game. Make it catchy!
 SERVERNAME = "FateCore"
 
-
-TRAIT_CLASS_PATHS = ["characters.sheet.SkillTrait"]
+# Scripts which are always running, reachable as evennia.GLOBAL_SCRIPTS.<key>
+GLOBAL_SCRIPTS = {
+    "conflict_scheduler": {
+        "typeclass": "conflict.scheduler.ConflictScheduler",
+        "interval": 1,
+        "persistent": True,
+        "desc": "Runs the turns of all active conflicts.",
+    },
+    "consequence_recovery": {
+        "typeclass": "characters.recovery.RecoveryScheduler",
+        "persistent": True,
+        "desc": "Recovers consequences when they're due.",
+    },
+}
 
 ######################################################################
 # Settings given in secret_settings.py override those in this file.
@@ -7,12 +7,13 @@ is setup to be the "default" character type created by the default
 creation commands.
 
 """
-from evennia.utils import search, create, logger
+from evennia.utils import logger, lazy_property
 from evennia.objects.objects import DefaultCharacter
 from .objects import ObjectParent
 
-from evennia.contrib.rpg.traits import TraitHandler
-from characters.sheet import AspectHandler, StatusHandler, init_skills
+from characters.sheet import AspectHandler, SkillHandler, StatusHandler, init_skills
+from groups.commands import GroupCmdSet
+from groups.pool import GROUP_POOL
 
 class Character(ObjectParent, DefaultCharacter):
 	"""
@@ -34,26 +35,41 @@ class Character(ObjectParent, DefaultCharacter):
 	at_post_puppet - Echoes "AccountName has entered the game" to the room.
 
 	"""
+	# handlers cached on the instance, dropped whenever the instance is (re)loaded
+	cached_handlers = ObjectParent.cached_handlers + ("aspects", "skills", "status")
 
-	@property
+	@lazy_property
 	def aspects(self):
 		"""Stores the character's aspects and refresh."""
 		return AspectHandler(self)
 	
-	@property
+	@lazy_property
 	def skills(self):
 		"""
-		See the Traits contrib for full documentation.
+		Stores the character's skill ratings.
 		"""
-		return TraitHandler(self, db_attribute_key="skills", db_attribute_category="skills")
+		return SkillHandler(self)
 
-	@property
+	@lazy_property
 	def status(self):
 		"""
 		Stores and manages the characters current status: consequences, stress
 		"""
 		return StatusHandler(self)
 	
+	def at_cmdset_get(self, **kwargs):
+		"""
+		Called whenever the character's cmdsets are gathered. Attaches or
+		removes the group commands to match the character's group.
+		"""
+		super().at_cmdset_get(**kwargs)
+		grouped = bool(self.ndb.group)
+		if grouped != self.cmdset.has(GroupCmdSet):
+			if grouped:
+				self.cmdset.add(GroupCmdSet, persistent=False)
+			else:
+				self.cmdset.remove(GroupCmdSet)
+
 	def at_object_creation(self):
 		"""
 		Run once when a Character object is initially created.
@@ -71,15 +87,22 @@ class Character(ObjectParent, DefaultCharacter):
 	def at_post_puppet(self, **kwargs):
 		if not self.ndb.group:
 			# Add a starting solo group
-			free = search.search_tag("empty", "group")
-			if len(free) > 0:
-				# there are available group scripts, use one
-				new_group = free[0]
-				new_group.tags.remove("empty", "group")
-			else:
-				# create a new group script
-				new_group = create.script(typeclass="groups.script.GroupScript")
-
+			new_group = GROUP_POOL.acquire()
 			success = new_group.add(self)
+		else:
+			self.ndb.group.refresh_sessions(self)
+			# puppeting puts the character back on the grid without a move
+			self.ndb.group.relocate(self)
+
+		super().at_post_puppet(**kwargs)
+
+	def at_post_unpuppet(self, account=None, session=None, **kwargs):
+		super().at_post_unpuppet(account=account, session=session, **kwargs)
+		if group := self.ndb.group:
+			group.refresh_sessions(self)
+			group.relocate(self)
 
-		super().at_post_puppet(**kwargs)
\ No newline at end of file
+	def at_post_move(self, source_location, move_type="move", **kwargs):
+		super().at_post_move(source_location, move_type=move_type, **kwargs)
+		if group := self.ndb.group:
+			group.relocate(self)
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Mobs
+
+A Mob is a single object standing in for a whole group of minions, as
+per the Fate mob rules. All of the minions live in one attribute; see
+`conflict.mob` for how they're stored and how they fight.
+
+"""
+from evennia.objects.objects import DefaultObject
+from evennia.utils import lazy_property
+from .objects import ObjectParent
+
+from conflict.mob import MobState
+
+
+class Mob(ObjectParent, DefaultObject):
+	"""
+	A group of minions that act as one.
+	"""
+	cached_handlers = ObjectParent.cached_handlers + ("mob",)
+
+	@lazy_property
+	def mob(self):
+		"""The minions' state, loaded once from the _mob attribute."""
+		if data := self.attributes.get("_mob"):
+			return MobState.from_data(data)
+		return MobState()
+
+	def populate(self, size, skills=None, boxes=1):
+		"""
+		Fill the mob with `size` identical minions.
+
+		Args:
+			size (int): how many minions
+			skills (dict): {skill: rating} for the minions
+			boxes (int): how many stress boxes each minion has
+		"""
+		self.set_state(MobState.build(size, skills, boxes))
+
+	def set_state(self, state):
+		"""
+		Replace the minions' state, e.g. with the result of an off-screen
+		conflict, and save it.
+
+		Args:
+			state (MobState): the new state
+		"""
+		self.__dict__["mob"] = state
+		self.save_mob()
+
+	def save_mob(self):
+		"""
+		Write the minions' state back in one attribute write.
+		"""
+		self.attributes.add("_mob", self.mob.to_data())
+
+	def attack(self, skill, dice=None):
+		"""
+		Attack with `skill` as one, at the mob's group rating.
+
+		Returns the result, or None if no minions are left.
+		"""
+		return self.mob.attack(skill, dice)
+
+	def defend(self, skill, attacks=1, dice=None):
+		"""
+		Defend as a group against `attacks` attacks, from one dice batch.
+		"""
+		return self.mob.defend(skill, attacks, dice)
+
+	def take_hit(self, shifts):
+		"""
+		Apply a hit, saving the result. Returns how many minions were taken out.
+		"""
+		taken_out = self.mob.take_hit(shifts)
+		self.save_mob()
+		if self.location and not self.mob.active():
+			self.location.msg_contents(f"The last of {self.key} is taken out!")
+		return len(taken_out)
+
+	def get_display_name(self, looker=None, **kwargs):
+		name = super().get_display_name(looker, **kwargs)
+		return f"{name} ({len(self.mob.active())})"
@@ -10,26 +10,51 @@ the other types, you can do so by adding this as a multiple
 inheritance.
 
 """
-from evennia.utils import list_to_string
+from evennia.utils import lazy_property
 from evennia.objects.objects import DefaultObject
-from world.skills import THE_LADDER
+from world.checks import CheckRegistry
 
 class ObjectParent:
 	"""
 	Sets and overrides various pre-check hooks to enable skill check requirements.
 	"""
+	# handlers cached on the instance, dropped whenever the instance is (re)loaded
+	cached_handlers = ("checks",)
+
+	@lazy_property
+	def checks(self):
+		"""All of the skill checks set on this object."""
+		return CheckRegistry(self)
+
+	def clear_handlers(self):
+		"""
+		Forget the cached handlers so they reload from attributes on next access.
+		"""
+		for handler in self.cached_handlers:
+			self.__dict__.pop(handler, None)
+
+	def at_init(self):
+		"""
+		Called whenever the object is loaded into the cache, including after a reload.
+		"""
+		super().at_init()
+		self.clear_handlers()
+
+	def at_idmapper_flush(self):
+		"""
+		Drop the cached handlers along with the instance when the cache is flushed.
+		"""
+		if flush := super().at_idmapper_flush():
+			self.clear_handlers()
+		return flush
+
 	def at_pre_get(self, doer, **kwargs):
 		if kwargs.get("passed",False):
 			# the skill check was already completed
 			return True
 
-		if skillcheck := self.attributes.get("get_check"):
-			message = []
-			if desc := skillcheck.get("desc"):
-				message.append(desc)
-			skills = [f"{THE_LADDER[level]} {skill}" for skill, level in skillcheck.get("skills",{}).items()]
-			message.append(f"Getting this requires {list_to_string(skills, endsep=' or ')}.")
-			doer.msg("\n".join(message))
+		if message := self.checks.requirement("get_check", "Getting this"):
+			doer.msg(message)
 			return False
 		else:
 			return True
@@ -43,16 +68,11 @@ class ObjectParent:
 		if kwargs.get("passed",False):
 			return True
 		
-		if self.has.tags("open"):
+		if self.tags.has("open"):
 			return True
 
-		if skillcheck := self.attributes.get("open_check"):
-			message = []
-			if desc := skillcheck.get("desc"):
-				message.append(desc)
-			skills = [f"{THE_LADDER[level]} {skill}" for skill, level in skillcheck.get("skills",{}).items()]
-			message.append(f"Opening this requires {list_to_string(skills, endsep=' or ')}.")
-			doer.msg("\n".join(message))
+		if message := self.checks.requirement("open_check", "Opening this"):
+			doer.msg(message)
 			return False
 		else:
 			return True
@@ -62,13 +82,8 @@ class ObjectParent:
 			# the skill check was already completed
 			return True
 
-		if skillcheck := self.attributes.get("use_check"):
-			message = []
-			if desc := skillcheck.get("desc"):
-				message.append(desc)
-			skills = [f"{THE_LADDER[level]} {skill}" for skill, level in skillcheck.get("skills",{}).items()]
-			message.append(f"Using this requires {list_to_string(skills, endsep=' or ')}.")
-			doer.msg("\n".join(message))
+		if message := self.checks.requirement("use_check", "Using this"):
+			doer.msg(message)
 			return False
 		else:
 			return True
@@ -79,23 +94,13 @@ class ObjectParent:
 			return True
 
 		# check if location requires a skill check to leave
-		if skillcheck := self.location.attributes.get("leave_check"):
-			message = []
-			if desc := skillcheck.get("desc"):
-				message.append(desc)
-			skills = [f"{THE_LADDER[level]} {skill}" for skill, level in skillcheck.get("skills",{}).items()]
-			message.append(f"Leaving here requires {list_to_string(skills, endsep=' or ')}.")
-			self.msg("\n".join(message))
+		if self.location and (message := self.location.checks.requirement("leave_check", "Leaving here")):
+			self.msg(message)
 			return False
 
 		# check if destination requires a skill check to enter
-		elif skillcheck := destination.attributes.get("enter_check"):
-			message = []
-			if desc := skillcheck.get("desc"):
-				message.append(desc)
-			skills = [f"{THE_LADDER[level]} {skill}" for skill, level in skillcheck.get("skills",{}).items()]
-			message.append(f"Going there requires {list_to_string(skills, endsep=' or ')}.")
-			self.msg("\n".join(message))
+		elif message := destination.checks.requirement("enter_check", "Going there"):
+			self.msg(message)
 			return False
 
 		else:
@@ -147,7 +152,7 @@ class Object(ObjectParent, DefaultObject):
 			return ""
 
 		# was this behind a skill check?
-		if view_check := self.db.view_check:
+		if view_check := self.checks.get("view_check"):
 			return view_check.get("desc") or "This is hidden."
 		
 		return super().return_appearance(looker, **kwargs)
@@ -180,7 +185,7 @@ class Object(ObjectParent, DefaultObject):
 			name = self.name
 
 		# is this behind a skill check?
-		if self.db.view_check:
+		if "view_check" in self.checks:
 			name = f"{name} (hidden)"
 				
 		return name
@@ -200,10 +205,10 @@ class Object(ObjectParent, DefaultObject):
 			permissions or the at_pre_get() hook for that.
 		"""
 		
-		if check := self.db.view_check:
+		if check := self.checks.get("view_check"):
 			if lockstring := check.get("lock"):
 				self.locks.add(lockstring)
-			self.attributes.remove("view_check")
+			self.checks.remove("view_check")
 
 	def at_open(self, doer, **kwargs):
 		"""
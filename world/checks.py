@@ -0,0 +1,151 @@
+"""
+Skill checks
+
+Skill check definitions are stored on objects as `<action>_check` and
+`<action>_passive_check` attributes, all under the "skillcheck" category.
+Each object's checks are loaded together, in one query, into a
+`CheckRegistry` that is cached on the object and shared by the pre-action
+hooks, lockfuncs and commands.
+
+The registry notices when a check attribute is written, however it was
+written, and recompiles it. Checks written without a category, whether
+before the registry existed or by a builder's `set` since, are moved
+into it as soon as the registry sees them.
+"""
+from evennia.utils import list_to_string
+
+from world.ladder import LADDER
+from world.skills import SKILL_INDEX
+
+CHECK_CATEGORY = "skillcheck"
+
+# the actions which can have a check, and the attribute keys they use
+CHECK_ACTIONS = ("view", "get", "open", "use", "enter", "leave")
+CHECK_KEYS = frozenset(f"{action}{kind}_check" for action in CHECK_ACTIONS for kind in ("", "_passive"))
+
+
+def compile_check(check):
+	"""
+	Compile a check's {skill: level} requirements into a tuple of
+	(skill index, level) pairs.
+	"""
+	return tuple(
+		(SKILL_INDEX[skill.lower()], level)
+		for skill, level in (check.get("skills") or {}).items()
+		if skill.lower() in SKILL_INDEX
+	)
+
+
+def passes(doer, compiled):
+	"""
+	Check if `doer` meets any of the skill levels in a compiled check.
+	"""
+	values = doer.skills.values
+	return any(values[index] >= level for index, level in compiled)
+
+
+class CheckRegistry:
+	"""
+	All of an object's skill checks, kept in memory.
+
+	Each entry remembers the attribute's stored value it was loaded from.
+	Any write to the attribute replaces that value, including a builder's
+	`set` or a direct `attributes.add`, so a changed check is reloaded and
+	recompiled the next time it's used.
+	"""
+	def __init__(self, obj):
+		self.obj = obj
+		# key: [stored value, check, compiled check or None]
+		self._entries = {}
+		self._migrate()
+		for attr in obj.attributes.get(category=CHECK_CATEGORY, return_obj=True, return_list=True):
+			self._load(attr)
+
+	def _migrate(self):
+		"""
+		Move checks stored without a category into CHECK_CATEGORY.
+		"""
+		attributes = self.obj.attributes
+		for attr in attributes.all():
+			if attr.category is None and attr.key in CHECK_KEYS:
+				self._migrate_attr(attr)
+
+	def _migrate_attr(self, attr):
+		attributes = self.obj.attributes
+		attributes.add(attr.key, attr.value, category=CHECK_CATEGORY)
+		attributes.remove(attr.key)
+
+	def _load(self, attr):
+		value = attr.value
+		check = value.deserialize() if hasattr(value, "deserialize") else value
+		entry = self._entries[attr.key] = [attr.db_value, check, None]
+		return entry
+
+	def _entry(self, key):
+		"""
+		Get the entry for a check, reloading it if its attribute has been
+		written since it was loaded. The attribute lookup is served from
+		the object's attribute cache.
+
+		A check written without a category, e.g. by a builder's `set`,
+		replaces the stored one and is moved into CHECK_CATEGORY.
+		"""
+		attributes = self.obj.attributes
+		if key in CHECK_KEYS and (attr := attributes.get(key, return_obj=True)):
+			self._migrate_attr(attr)
+		if not (attr := attributes.get(key, category=CHECK_CATEGORY, return_obj=True)):
+			self._entries.pop(key, None)
+			return None
+		entry = self._entries.get(key)
+		if entry is None or entry[0] is not attr.db_value:
+			entry = self._load(attr)
+		return entry
+
+	def get(self, key):
+		"""
+		Get the check stored under `key`, e.g. "get_check", or None.
+		"""
+		return entry[1] if (entry := self._entry(key)) else None
+
+	def __contains__(self, key):
+		return self._entry(key) is not None
+
+	def compiled(self, key):
+		"""
+		Get the compiled form of a check, or None if there is no such check.
+		"""
+		if not (entry := self._entry(key)):
+			return None
+		if entry[2] is None:
+			entry[2] = compile_check(entry[1])
+		return entry[2]
+
+	def set(self, key, check):
+		"""
+		Store a check on the object.
+		"""
+		self.obj.attributes.add(key, check, category=CHECK_CATEGORY)
+		self._entries.pop(key, None)
+
+	def remove(self, key):
+		"""
+		Remove a check from the object.
+		"""
+		self._entries.pop(key, None)
+		self.obj.attributes.remove(key, category=CHECK_CATEGORY)
+
+	def requirement(self, key, doing):
+		"""
+		Describe what it takes to pass a check, e.g. "Getting this requires
+		Good Burglary." preceded by the check's description, if any.
+
+		Returns None if there is no such check.
+		"""
+		if not (check := self.get(key)):
+			return None
+		message = []
+		if desc := check.get("desc"):
+			message.append(desc)
+		skills = [f"{LADDER.desc(level)} {skill}" for skill, level in check.get("skills",{}).items()]
+		message.append(f"{doing} requires {list_to_string(skills, endsep=' or ')}.")
+		return "\n".join(message)
@@ -0,0 +1,97 @@
+"""
+Fate dice
+
+Every 4dF roll in the game goes through this module. A roll is one of
+the 81 equally likely face combinations, so it is drawn as a single
+index into precomputed tables instead of four separate dice, and the
+coloured face string is only looked up when someone is going to see it.
+"""
+from itertools import product
+from random import Random
+
+# every possible combination of four fudge dice
+OUTCOMES = tuple(product((-1, 0, 1), repeat=4))
+TOTALS = tuple(sum(faces) for faces in OUTCOMES)
+
+_FACES = {-1: '[|r-|n]', 0: '[ ]', 1: '[|g+|n]'}
+_RENDERED = tuple(" ".join(_FACES[face] for face in faces) for faces in OUTCOMES)
+_INDEXES = range(len(OUTCOMES))
+
+
+class DiceStream:
+	"""
+	An independent, optionally seeded source of 4dF rolls.
+	"""
+	def __init__(self, seed=None):
+		self.rng = Random(seed)
+
+	def seed(self, seed=None):
+		"""Reseed the stream, e.g. to replay a fight."""
+		self.rng.seed(seed)
+
+	def roll(self):
+		"""
+		Roll 4dF once.
+
+		Returns a tuple of the outcome, to pass to `render`, and the total.
+		"""
+		outcome = self.rng.randrange(81)
+		return (outcome, TOTALS[outcome])
+
+	def rolls(self, count):
+		"""
+		Roll 4dF `count` times in one draw.
+
+		Returns a list of (outcome, total) tuples.
+		"""
+		return [(outcome, TOTALS[outcome]) for outcome in self.rng.choices(_INDEXES, k=count)]
+
+	def totals(self, count):
+		"""
+		Roll 4dF `count` times in one draw, returning only the totals.
+		"""
+		return self.rng.choices(TOTALS, k=count)
+
+
+# the default stream, used when nothing more specific is asked for
+DICE = DiceStream()
+
+_STREAMS = {}
+
+def stream(key=None, seed=None):
+	"""
+	Get the dice stream for `key` (e.g. a group id), creating it if needed.
+
+	Passing a seed (re)seeds the stream. Without a key, the shared default
+	stream is returned.
+	"""
+	if key is None:
+		dice = DICE
+	elif not (dice := _STREAMS.get(key)):
+		dice = _STREAMS[key] = DiceStream(seed)
+		return dice
+	if seed is not None:
+		dice.seed(seed)
+	return dice
+
+def drop_stream(key):
+	"""Forget a keyed stream once its owner is gone."""
+	_STREAMS.pop(key, None)
+
+def render(outcome):
+	"""
+	Get the coloured face string for a rolled outcome.
+	"""
+	return _RENDERED[outcome]
+
+def roll(dice=None):
+	"""
+	Roll 4dF, returning a tuple of the outcome and the total.
+	"""
+	return (dice or DICE).roll()
+
+def roll_batch(count, dice=None):
+	"""
+	Roll 4dF `count` times at once, returning a list of totals.
+	"""
+	return (dice or DICE).totals(count)
@@ -0,0 +1,77 @@
+"""
+The Ladder
+
+Turns numeric results into their ladder names. The table is compiled once
+from `world.skills.THE_LADDER`, so a lookup is a clamp and an index instead
+of a walk over the whole ladder.
+"""
+from math import ceil
+
+from world.skills import THE_LADDER
+
+_COLORS = ((-1, "|r"), (0, "|x"), (2, "|w"), (4, "|g"), (6, "|c"))
+_TOP_COLOR = "|y"
+
+
+class Ladder:
+	def __init__(self, ladder):
+		"""
+		Compile a {upper_bound_inclusive: text} mapping, ordered from
+		small to big, into a lookup table.
+		"""
+		bounds = list(ladder.items())
+		self.low = int(bounds[0][0])
+		self.high = int(ceil(bounds[-1][0]))
+
+		labels = []
+		for value in range(self.low, self.high+1):
+			# any value above the highest bound keeps the highest text
+			text = bounds[-1][1]
+			for bound, txt in bounds:
+				if value <= bound:
+					text = txt
+					break
+			labels.append(text)
+		self.labels = tuple(labels)
+		self.colored = tuple(
+			f"{self._color(value)}{text}|n" for value, text in zip(range(self.low, self.high+1), labels)
+		)
+
+	@staticmethod
+	def _color(value):
+		for bound, color in _COLORS:
+			if value <= bound:
+				return color
+		return _TOP_COLOR
+
+	def index(self, value):
+		"""Get the table index for a value, clamped to the ladder."""
+		if value.__class__ is not int:
+			value = ceil(value)
+		if value <= self.low:
+			return 0
+		if value >= self.high:
+			return self.high - self.low
+		return value - self.low
+
+	def desc(self, value):
+		"""
+		Get the ladder name for a value, e.g. 3 is "Good".
+		"""
+		return self.labels[self.index(value)]
+
+	def cdesc(self, value):
+		"""
+		Get the colour-coded ladder name for a value.
+		"""
+		return self.colored[self.index(value)]
+
+	def levels(self, start=None):
+		"""
+		Iterate over (value, name) for every named level, from `start` up.
+		"""
+		start = self.low if start is None else max(start, self.low)
+		return zip(range(start, self.high+1), self.labels[start-self.low:])
+
+
+LADDER = Ladder(THE_LADDER)
@@ -0,0 +1,94 @@
+"""
+Check odds
+
+Exact odds for skill checks, worked out from the 4dF distribution rather
+than by rolling samples. Everything is memoized, and there are only a
+handful of distinct inputs in play, so after warming up a lookup is a
+dict hit.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+from world.dice import TOTALS
+
+Odds = namedtuple("Odds", ("fail", "tie", "success", "style"))
+
+# how many shifts a success with style needs
+STYLE = 3
+# how much a single invoke adds
+INVOKE_BONUS = 2
+
+
+@lru_cache(maxsize=None)
+def distribution(dice_sets=1):
+	"""
+	The exact distribution of the sum of `dice_sets` rolls of 4dF.
+
+	Returns a tuple of (lowest total, probabilities), where probabilities
+	is a tuple indexed from the lowest total up.
+	"""
+	if dice_sets <= 1:
+		counts = [0] * 9
+		for total in TOTALS:
+			counts[total+4] += 1
+		return (-4, tuple(count / len(TOTALS) for count in counts))
+
+	# convolve one more set of dice onto the smaller distribution
+	low, probs = distribution(dice_sets-1)
+	base_low, base = distribution(1)
+	result = [0.0] * (len(probs) + len(base) - 1)
+	for i, p in enumerate(probs):
+		for j, q in enumerate(base):
+			result[i+j] += p * q
+	return (low + base_low, tuple(result))
+
+
+def teamwork_bonus(skill, helpers):
+	"""
+	Each helper adds +1, capped at the helped character's skill rating.
+	"""
+	return max(0, min(helpers, skill))
+
+
+@lru_cache(maxsize=4096)
+def check_odds(skill, difficulty, invokes=0, helpers=0, opposed=False):
+	"""
+	Get the odds of each outcome of a skill check.
+
+	Args:
+		skill (int): the acting character's skill rating
+		difficulty (int): the check's level, or the opposing skill
+			rating if `opposed` is True
+		invokes (int): how many +2 invokes will be added
+		helpers (int): how many characters are assisting
+		opposed (bool): whether the opposition rolls too
+
+	Returns:
+		Odds: the probabilities of fail, tie, success and success with style.
+	"""
+	bonus = skill + invokes*INVOKE_BONUS + teamwork_bonus(skill, helpers)
+	low, probs = distribution(2 if opposed else 1)
+
+	fail = tie = success = style = 0.0
+	for i, p in enumerate(probs):
+		shifts = bonus + low + i - difficulty
+		if shifts < 0:
+			fail += p
+		elif shifts == 0:
+			tie += p
+		elif shifts < STYLE:
+			success += p
+		else:
+			style += p
+	return Odds(fail, tie, success, style)
+
+
+def odds_for_check(skill_name, skill, check, **kwargs):
+	"""
+	Get the odds of passing a stored `<action>_check` with a given skill.
+
+	Returns None if the skill can't be used for the check.
+	"""
+	if (level := check.get("skills", {}).get(skill_name)) is None:
+		return None
+	return check_odds(skill, level, **kwargs)
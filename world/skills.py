@@ -20,6 +20,11 @@ SKILL_LIST = {
 	"Stealth":     ['o','c',    'd'],
 	"Will":        ['o','c',    'd'],
 }
+
+# fixed skill order, used to index skill vectors
+SKILL_NAMES = tuple(SKILL_LIST)
+SKILL_KEYS = tuple(skill.lower() for skill in SKILL_NAMES)
+SKILL_INDEX = {key: i for i, key in enumerate(SKILL_KEYS)}
 	
 THE_LADDER = {
 	-2: "Terrible",
@@ -0,0 +1,84 @@
+"""
+Timer wheel
+
+One shared timer for the many short deadlines that are in play at once,
+such as group polls. Deadlines are dropped into one-second slots on a
+wheel that a single LoopingCall turns, so any number of pending deadlines
+costs the reactor one repeating call, and only while any are pending.
+"""
+from math import ceil
+
+from twisted.internet.task import LoopingCall
+from evennia.utils import logger
+
+
+class TimerWheel:
+	def __init__(self, slots=64, resolution=1.0):
+		"""
+		Args:
+			slots (int): how many slots are on the wheel
+			resolution (float): how many seconds each slot covers
+		"""
+		self.slots = [{} for _ in range(slots)]
+		self.resolution = resolution
+		self.position = 0
+		# handle: slot index, for every pending deadline
+		self._pending = {}
+		self._next_handle = 0
+		self._loop = None
+
+	def schedule(self, delay, callback, *args, **kwargs):
+		"""
+		Call `callback(*args, **kwargs)` in about `delay` seconds.
+
+		Returns a handle which can be passed to `cancel`.
+		"""
+		ticks = max(1, ceil(delay / self.resolution))
+		slot = (self.position + ticks) % len(self.slots)
+		# how many more times the wheel passes this slot before it's due
+		laps = (ticks - 1) // len(self.slots)
+
+		self._next_handle += 1
+		handle = self._next_handle
+		self.slots[slot][handle] = [laps, callback, args, kwargs]
+		self._pending[handle] = slot
+
+		if not (self._loop and self._loop.running):
+			self._loop = LoopingCall(self.tick)
+			self._loop.start(self.resolution, now=False)
+		return handle
+
+	def cancel(self, handle):
+		"""
+		Cancel a pending deadline. Cancelling one that already fired does nothing.
+		"""
+		if (slot := self._pending.pop(handle, None)) is not None:
+			del self.slots[slot][handle]
+
+	def tick(self):
+		"""
+		Turn the wheel one slot and fire everything due there.
+		"""
+		self.position = (self.position + 1) % len(self.slots)
+		bucket = self.slots[self.position]
+
+		due = []
+		for handle, entry in list(bucket.items()):
+			if entry[0] > 0:
+				entry[0] -= 1
+			else:
+				del bucket[handle]
+				del self._pending[handle]
+				due.append(entry)
+
+		for _, callback, args, kwargs in due:
+			try:
+				callback(*args, **kwargs)
+			except Exception:
+				logger.log_trace()
+
+		if not self._pending and self._loop and self._loop.running:
+			self._loop.stop()
+
+
+WHEEL = TimerWheel()